@@ -1,13 +1,24 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.figure_factory as ff
-from scipy import stats
-from scipy.stats import chisquare
 import os
-import urllib.parse
+
+# Plotting and statistics stacks (matplotlib, seaborn, scipy) are imported
+# where they are first used, so the cold start only loads what the input
+# form needs.
+from simulator import (DISCIPLINES, DISTRIBUTIONS, compact, describe, expand, results_frame, run_simulation,
+                       slice_result)
+from simulator.dataset import WORKBOOK
+from simulator.export import EXPORT_FORMATS, export_bytes
+from simulator.fit import FIT_METHODS, INSUFFICIENT_DATA
+from simulator.gantt import MAX_PATIENT_BARS, gantt_figure
+from simulator.playback import advance, build_timeline, new_playback_state, pause, play, snapshot, stop
+from simulator.profiling import (available_profilers, configure_logging, finish_profile, log_profile, profile_rows,
+                                 stage, start_profile)
+from simulator.store import load_results, save_results
+from simulator.streams import BIT_GENERATORS, run_rng
+from simulator.trace import TRACE_MODES
+from simulator.variance import CONTROLS, DEFAULT_CONTROLS, VARIANCE_METHODS
 
 # --- Streamlit Setup ---
 st.set_page_config(page_title="Patient Queue Simulator", page_icon="🩺", layout="wide")
@@ -62,206 +73,528 @@ with st.sidebar:
     if SOME_SECTION_KEY is not None:
         st.write("Additional config loaded (some_section.some_key)")
 
+# --- Trace Sources ---
+DATA_SOURCES = ["Parametric", "Lab Data", "Uploaded CSV"]
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def csv_columns(file_id, _upload):
+    """Header of an uploaded CSV (the upload is identified by its file id, not hashed)"""
+    header = pd.read_csv(_upload, nrows=0).columns.tolist()
+    _upload.seek(0)
+    return header
+
+
+# Traces are shared read-only across reruns and sessions: cache_resource
+# avoids copying (pickling) millions of records on every cache hit.
+@st.cache_resource(max_entries=4, show_spinner="Reading trace...")
+def uploaded_trace(file_id, time_kind, time_column, service_column, _upload):
+    from simulator.trace import read_trace_csv
+
+    if _upload is None:
+        raise RuntimeError("The uploaded trace is no longer cached; please upload it again.")
+    columns = {"inter_arrival_column" if time_kind == "Inter-arrival Times" else "arrival_column": time_column}
+    trace = read_trace_csv(_upload, service_column, **columns)
+    _upload.seek(0)
+    return trace
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def lab_trace_arrays(workbook_mtime):
+    from simulator.trace import lab_trace
+
+    return lab_trace()
+
+
+def resolve_trace(params):
+    """The trace a run's parameters refer to (None for parametric runs)"""
+    if params["source"] == "Lab Data":
+        return lab_trace_arrays(os.stat(WORKBOOK).st_mtime_ns)
+    if params["source"] == "Uploaded CSV":
+        return uploaded_trace(*params["upload"], _upload=None)
+    return None
+
+
 # --- Sidebar ---
 with st.sidebar:
     st.header("⚙️ Simulation Settings")
+    source = st.selectbox("🗂️ Patient Data", DATA_SOURCES)
+    trace_mode, upload = TRACE_MODES[0], None
+    if source != "Parametric":
+        trace_mode = st.selectbox("Trace Mode", TRACE_MODES,
+                                  help="Replay the records as observed, or resample them for a longer horizon")
+    if source == "Uploaded CSV":
+        upload = st.file_uploader("Trace CSV", type="csv")
+        upload_columns = csv_columns(upload.file_id, upload) if upload else []
+        time_kind = st.radio("Arrival Column Holds", ["Inter-arrival Times", "Arrival Times"], horizontal=True)
+        time_column = st.selectbox("Arrival Column", upload_columns)
+        service_column = st.selectbox("Service Column", upload_columns, index=min(1, max(len(upload_columns) - 1, 0)))
     simulation_time = st.number_input("⏱️ Total Simulation Time (minutes)", min_value=1, value=60)
-    enable_cp = st.checkbox("✅ Enable Cumulative Probability Stop")
-
+    if source == "Parametric":
+        enable_cp = st.checkbox("✅ Enable Cumulative Probability Stop")
+    else:
+        enable_cp = False
+        if trace_mode == "Replay":
+            st.caption("Replay stops at the end of the trace or at the simulation time, whichever comes first.")
+
+    # For trace runs the distributions are only used by the goodness-of-fit tests
+    fit_label = "" if source == "Parametric" else " (for fit tests)"
     st.subheader("📥 Arrival")
-    mean_arrival = st.number_input("Mean Inter-arrival Time", min_value=0.1, value=5.0)
-    arrival_dist = st.selectbox("Arrival Distribution", ["Exponential", "Poisson", "Uniform", "Normal"])
+    if source == "Parametric":
+        mean_arrival = st.number_input("Mean Inter-arrival Time", min_value=0.1, value=5.0)
+    arrival_dist = st.selectbox("Arrival Distribution" + fit_label, DISTRIBUTIONS)
 
     st.subheader("🧾 Service")
-    mean_service = st.number_input("Mean Service Time", min_value=0.1, value=3.0)
-    service_dist = st.selectbox("Service Distribution", ["Exponential", "Poisson", "Uniform", "Normal"])
-
-# --- Distribution Generator ---
-def generate_time(dist, mean):
-    if dist == "Exponential":
-        return np.random.exponential(scale=mean)
-    elif dist == "Poisson":
-        return np.random.poisson(lam=mean)
-    elif dist == "Uniform":
-        return np.random.uniform(low=mean * 0.5, high=mean * 1.5)
-    elif dist == "Normal":
-        return max(0, np.random.normal(loc=mean, scale=mean * 0.3))
-    return mean
-
-# --- CDF Helper ---
-def get_cdf(x, dist, mean):
-    if dist == "Exponential":
-        return stats.expon.cdf(x, scale=mean)
-    elif dist == "Poisson":
-        return stats.poisson.cdf(x, mu=mean)
-    elif dist == "Uniform":
-        return stats.uniform.cdf(x, loc=mean * 0.5, scale=mean)
-    elif dist == "Normal":
-        return stats.norm.cdf(x, loc=mean, scale=mean * 0.3)
-    return 0
+    if source == "Parametric":
+        mean_service = st.number_input("Mean Service Time", min_value=0.1, value=3.0)
+    service_dist = st.selectbox("Service Distribution" + fit_label, DISTRIBUTIONS)
+
+    st.subheader("👥 Servers")
+    servers = st.number_input("Number of Servers", min_value=1, value=1)
+    discipline = st.selectbox("Queue Discipline", DISCIPLINES)
+    if discipline == "Priority":
+        priority_levels = st.number_input("Priority Levels (1 = highest)", min_value=1, value=3)
+
+    st.subheader("🔁 Replications")
+    replications = 1
+    if source == "Parametric":
+        replications = st.number_input("Independent Replications", min_value=1, value=1)
+    else:
+        st.caption("Replications are available for parametric runs.")
+    if replications > 1:
+        confidence = st.selectbox("Confidence Level", [0.90, 0.95, 0.99], index=1)
+        max_workers = st.number_input("Worker Processes", min_value=1, value=os.cpu_count() or 1)
+        # Control variates rely on horizon-terminated runs, whose controls have known means
+        variance_method = st.selectbox("Variance Reduction", [m for m in VARIANCE_METHODS
+                                                              if not (enable_cp and m == "Control Variates")],
+                                       help="Antithetic pairs or control variates with known means "
+                                            "narrow the intervals for the same number of runs")
+        controls, warmup = (), 0.0
+        if variance_method == "Control Variates":
+            # The M/M/c control has a known mean only for a stable queue
+            stable = mean_service < servers * mean_arrival
+            controls = tuple(st.multiselect("Controls", CONTROLS if stable else list(DEFAULT_CONTROLS),
+                                            default=list(DEFAULT_CONTROLS),
+                                            help="M/M/c Waiting Time is compared with the steady-state Wq: "
+                                                 "use a long horizon and a warm-up"))
+            warmup = st.slider("Warm-up (share of the horizon)", 0.0, 0.5, 0.0, 0.05)
+        target = st.number_input("Target Half-width (0 = none)", min_value=0.0, value=0.0,
+                                 help="Show how many runs each metric needs for this half-width")
+        alternative = None
+        if st.checkbox("Compare With Another Scenario",
+                       help="Replicate a changed configuration on the same random numbers"):
+            alternative = {
+                "service_dist": st.selectbox("Alternative Service Distribution", DISTRIBUTIONS,
+                                             index=DISTRIBUTIONS.index(service_dist)),
+                "mean_service": st.number_input("Alternative Mean Service Time", min_value=0.1,
+                                                value=float(mean_service)),
+                "servers": st.number_input("Alternative Number of Servers", min_value=1, value=servers),
+            }
+
+    st.subheader("🎲 Randomness")
+    seed = st.number_input("Random Seed (0 = new seed each run)", min_value=0, value=0)
+    bit_generator = st.selectbox("Bit Generator", BIT_GENERATORS)
+    crn = st.checkbox("Common Random Numbers", help="Separate arrival, service and priority streams drawn by "
+                      "inverse transform, so runs with the same seed share their random numbers across settings")
+
+    performance_panel = st.expander("⏱️ Performance")
+    with performance_panel:
+        trace_memory = st.checkbox("Track allocations (slower)", help="Peak memory per stage via tracemalloc")
+        profiler = st.selectbox("Profiler", available_profilers(),
+                                help="Capture a call profile of each page run")
+
+# --- Instrumentation ---
+# Every page run is timed stage by stage; the stages show up in the sidebar
+# panel and as one JSON line per run on the simulator.performance logger.
+configure_logging()
+previous = st.session_state.get("profile")
+if previous is not None:
+    finish_profile(previous)  # a run that ended early (st.stop, error) left it open
+profile = st.session_state["profile"] = start_profile(trace_memory, profiler)
+
+# --- Cached Simulation Core ---
+# Results are memoized on the run parameters (including the seed), so widget
+# reruns such as toggling playback never re-simulate.
+CACHE_ENTRIES = 32
+CACHE_TTL = 3600
+# A download button needs the finished file in memory, so only the last one is kept
+EXPORT_ENTRIES = 1
+PAGE_ROWS = 1000
+
+
+PAGE_KEYS = ("seed", "bit_generator", "crn", "source", "trace_mode", "upload")
+
+
+def run_params(params):
+    """Keyword arguments of `run_simulation` in a run's parameters"""
+    return {k: v for k, v in params.items() if k not in PAGE_KEYS}
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner="Simulating...")
+def simulate(params):
+    """Run one seeded simulation and compute its average metrics, caching the run in compact form"""
+    rng = run_rng(params["seed"], params["bit_generator"], params["crn"])
+    if params["source"] == "Parametric":
+        result = run_simulation(**run_params(params), rng=rng)
+    else:
+        from simulator.trace import run_trace
+
+        result = run_trace(resolve_trace(params), params["trace_mode"], params["simulation_time"],
+                           params["servers"], params["discipline"], params["priority_levels"], rng)
+    empty = len(result["arrival"]) == 0
+    metrics = {
+        "Avg. Arrival Time": np.nan if empty else np.mean(result["arrival"]),
+        "Avg. Service Time": np.nan if empty else np.mean(result["service"]),
+        "Avg. Turnaround Time": np.nan if empty else np.mean(result["turnaround"]),
+        "Avg. Waiting Time": np.nan if empty else np.mean(result["waiting"]),
+        "Avg. Response Time": np.nan if empty else np.mean(result["waiting"]),
+        "Utilization": np.mean(result["utilization"]),
+    }
+    return compact(result), metrics
+
+
+@st.cache_data(max_entries=EXPORT_ENTRIES, ttl=CACHE_TTL, show_spinner="Preparing export...")
+def export_file(params, fmt):
+    """Per-patient results of a run as CSV or Parquet bytes, written in chunks"""
+    result, _ = simulate(params)
+    return export_bytes(expand(result), fmt)
+
+
+def show_table(frame):
+    """Show a table with floats to two decimals, formatted by the browser rather than a Styler"""
+    st.dataframe(frame, width='stretch', hide_index=True, column_config={
+        column: st.column_config.NumberColumn(format="%.2f")
+        for column in frame.columns if frame[column].dtype.kind == "f"
+    })
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner="Running replications...")
+def replicate(params, replications, confidence, max_workers, reduction=("None", (), 0.0)):
+    """
+    Confidence intervals over replications seeded from the run seed.
+
+    `reduction` is (method, controls, warm-up) from the sidebar; antithetic
+    runs are spent as replications // 2 pairs. Plain C.P.-terminated FIFO
+    runs are simulated all at once as 2-D arrays; their stopping-size
+    distribution is returned too (None otherwise).
+    """
+    from simulator.replications import confidence_intervals, run_cp_replications, run_replications
+    from simulator.variance import antithetic_replications, control_variate_replications
+
+    method, controls, warmup = reduction
+    if method == "Antithetic Variates":
+        return antithetic_replications(run_params(params), max(2, replications // 2), confidence, params["seed"],
+                                       max_workers, params["bit_generator"]), None
+    if method == "Control Variates":
+        return control_variate_replications(run_params(params), replications, confidence, controls, warmup,
+                                            params["seed"], max_workers, params["bit_generator"]), None
+    if params["enable_cp"] and params["discipline"] == "FIFO":
+        runs = run_cp_replications(run_params(params), replications, seed=params["seed"],
+                                   bit_generator=params["bit_generator"])
+        sizes = runs["Patients"].value_counts(normalize=True).sort_index().rename("Share of Runs")
+        return confidence_intervals(runs, confidence), sizes
+    runs = run_replications(run_params(params), replications, seed=params["seed"], max_workers=max_workers,
+                            bit_generator=params["bit_generator"], crn=params["crn"])
+    return confidence_intervals(runs, confidence), None
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner="Comparing scenarios...")
+def compare(params, alternative, replications, confidence, max_workers):
+    """Intervals for alternative - current over replications sharing their random numbers"""
+    from simulator.variance import compare_scenarios
+
+    return compare_scenarios(run_params(params), alternative, replications, confidence, params["seed"],
+                             max_workers, params["bit_generator"])
+
+
+def with_target_runs(table, target, confidence, cost=1):
+    """`table` with the runs each metric needs for a `target` half-width, and without the reduction"""
+    from simulator.variance import required_replications
+
+    table = table.copy()
+    table["Runs for Target"] = required_replications(table["Std. Dev."], target, confidence) * cost
+    if "Variance Reduction" in table:
+        table["Plain Runs for Target"] = np.ceil(table["Runs for Target"] * table["Variance Reduction"])
+    return table
+
+
+def _fit_rows(tests, method):
+    from simulator.fit import goodness_of_fit
+
+    rows = []
+    for name, data, dist, mean in tests:
+        # Empty or too-short samples come back as "Insufficient data" with NaN statistics
+        fit = goodness_of_fit(data, dist, mean, method)
+        rows.append({
+            "Test": name,
+            method: round(fit["statistic"], 4),
+            "P-Value": round(fit["p_value"], 4),
+            "Result": fit["result"]
+        })
+    return pd.DataFrame(rows)
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def fit_table(params, method):
+    """Goodness-of-fit table for the inter-arrival and service samples"""
+    result = expand(simulate(params)[0])
+    return _fit_rows([
+        ("Inter-arrival Time", result["inter_arrival"], params["arrival_dist"], params["mean_arrival"]),
+        ("Service Time", result["service"], params["service_dist"], params["mean_service"]),
+    ], method)
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def lab_fit_table(arrival_dist, service_dist, method, workbook_mtime):
+    """The same tests on the collected lab data, with means taken from the data"""
+    from simulator.dataset import load_lab_data
+
+    lab = load_lab_data()
+    return _fit_rows([
+        ("Lab Inter-arrival Time", lab["inter_arrival"], arrival_dist, lab["inter_arrival"].mean()),
+        ("Lab Service Time", lab["service"], service_dist, lab["service"].mean()),
+    ], method)
+
 
 # --- Run Simulation ---
-if st.button("▶️ Run Simulation"):
-    arrival_times = []
-    service_times = []
-    arrival_cp = []
-    service_cp = []
-
-    current_time = 0
-    total_cp_a = total_cp_s = 0
-
-    while current_time < simulation_time:
-        a = generate_time(arrival_dist, mean_arrival)
-        s = generate_time(service_dist, mean_service)
-
-        cp_a = get_cdf(a, arrival_dist, mean_arrival)
-        cp_s = get_cdf(s, service_dist, mean_service)
-
-        if enable_cp:
-            if total_cp_a + cp_a > 1 and total_cp_s + cp_s > 1:
-                break
-            total_cp_a += cp_a
-            total_cp_s += cp_s
-            arrival_cp.append(round(total_cp_a, 4))
-            service_cp.append(round(total_cp_s, 4))
+run_clicked = st.button("▶️ Run Simulation", disabled=source == "Uploaded CSV" and upload is None)
+if run_clicked:
+    params = {
+        "source": source, "trace_mode": trace_mode, "upload": None,
+        "arrival_dist": arrival_dist, "service_dist": service_dist,
+        "simulation_time": simulation_time, "enable_cp": enable_cp,
+        "servers": servers, "discipline": discipline,
+        "priority_levels": priority_levels if discipline == "Priority" else 1,
+        "seed": seed or int(np.random.SeedSequence().entropy % 2**63),
+        "bit_generator": bit_generator, "crn": crn,
+    }
+    if source == "Parametric":
+        params.update(mean_arrival=mean_arrival, mean_service=mean_service)
+    else:
+        if source == "Uploaded CSV":
+            params["upload"] = (upload.file_id, time_kind, time_column, service_column)
+            trace = uploaded_trace(*params["upload"], _upload=upload)
         else:
-            arrival_cp.append(None)
-            service_cp.append(None)
-
-        current_time += a
-        if current_time > simulation_time:
-            break
-
-        arrival_times.append(round(current_time, 2))
-        service_times.append(round(s, 2))
-
-    # --- Queue Calculations ---
-    n = len(arrival_times)
-    start_time = []
-    complete_time = []
-    waiting_time = []
-    turnaround_time = []
-    response_time = []
-
-    for i in range(n):
-        start = arrival_times[i] if i == 0 else max(arrival_times[i], complete_time[i-1])
-        end = start + service_times[i]
-        wait = start - arrival_times[i]
-        tat = end - arrival_times[i]
-
-        start_time.append(round(start, 2))
-        complete_time.append(round(end, 2))
-        waiting_time.append(round(wait, 2))
-        turnaround_time.append(round(tat, 2))
-        response_time.append(round(wait, 2))
-
-    # --- Summary Metrics ---
-    df = pd.DataFrame({
-        "Patient": range(1, n+1),
-        "Arrival Time": arrival_times,
-        "Service Time": service_times,
-        "Start Time": start_time,
-        "Completion Time": complete_time,
-        "Waiting Time": waiting_time,
-        "Turnaround Time": turnaround_time,
-        "Response Time": response_time
-    })
-
-    if enable_cp:
-        df["Arrival C.P."] = arrival_cp
-        df["Service C.P."] = service_cp
+            trace = resolve_trace(params)
+        if len(trace["service"]) == 0:
+            st.error("The trace has no usable records (missing or negative times are dropped).")
+            st.stop()
+        if trace_mode != "Replay" and trace["inter_arrival"].sum() <= 0:
+            st.error(f"{trace_mode} sampling needs some positive inter-arrival times; use Replay for this trace.")
+            st.stop()
+        # Fit tests compare the trace against the selected distributions at its own means
+        params.update(mean_arrival=float(trace["inter_arrival"].mean()),
+                      mean_service=float(trace["service"].mean()))
+    with stage("Simulate"):
+        result, metrics = simulate(params)
+    save_results(st.session_state, params, result, metrics)
+    st.session_state["playback"] = new_playback_state()
+    st.session_state["replication_settings"] = (
+        (replications, confidence, max_workers, (variance_method, controls, warmup), target, alternative)
+        if replications > 1 else None
+    )
 
-    st.subheader("📋 Simulation Results")
-    st.dataframe(df.style.format(precision=2), width='stretch')
+# Every view below reads the stored run, so reruns triggered by widgets
+# (playback, downloads) never need a second simulation.
+results = load_results(st.session_state)
+if results is None:
+    st.info("Run a simulation to see results.")
+    finish_profile(profile)
+    st.stop()
+
+params = results["params"]
+arrays = results["arrays"]
+metrics = results["metrics"]
+servers = params["servers"]
+n = len(arrays["arrival"])
+arrival_times = np.round(arrays["arrival"], 2)
+service_times = np.round(arrays["service"], 2)
+start_time = np.round(arrays["start"], 2)
+complete_time = np.round(arrays["completion"], 2)
+
+st.subheader("📋 Simulation Results")
+seed_label = f"Seed: {params['seed']} ({params['bit_generator']}{', CRN' if params['crn'] else ''})"
+st.caption(seed_label if params["source"] == "Parametric"
+           else f"{seed_label} · {params['source']} trace, {params['trace_mode']}")
+# Only the visible page of the table is ever built; the summary covers every patient.
+pages = max(1, -(-n // PAGE_ROWS))
+page = st.number_input(f"Page (of {pages}, {PAGE_ROWS} patients each)", min_value=1, max_value=pages,
+                       value=1) if pages > 1 else 1
+first = (page - 1) * PAGE_ROWS
+with stage("Results Table"):
+    show_table(results_frame(slice_result(arrays, first, first + PAGE_ROWS), first=first + 1))
+    if n:
+        st.caption(f"Summary of all {n} patients")
+        show_table(describe(arrays))
+
+# --- Average Stats ---
+st.markdown("### 📊 Averages Summary")
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Avg. Arrival Time", f"{metrics['Avg. Arrival Time']:.2f}")
+    st.metric("Avg. Service Time", f"{metrics['Avg. Service Time']:.2f}")
+with col2:
+    st.metric("Avg. Turnaround Time", f"{metrics['Avg. Turnaround Time']:.2f}")
+    st.metric("Avg. Waiting Time", f"{metrics['Avg. Waiting Time']:.2f}")
+with col3:
+    st.metric("Avg. Response Time", f"{metrics['Avg. Response Time']:.2f}")
+    st.metric("Utilization", f"{metrics['Utilization']:.2f}")
+
+if st.session_state.get("replication_settings"):
+    replications, confidence, max_workers, reduction, target, alternative = st.session_state["replication_settings"]
+    method = reduction[0]
+    st.markdown(f"#### 🔁 Replication Summary ({replications} runs, {confidence:.0%} CI"
+                f"{'' if method == 'None' else ', ' + method})")
+    with stage("Replications"):
+        ci, stop_sizes = replicate(params, replications, confidence, max_workers, reduction)
+    if target:
+        ci = with_target_runs(ci, target, confidence, cost=2 if method == "Antithetic Variates" else 1)
+    st.dataframe(ci.style.format(precision=4), width='stretch')
+    if method != "None":
+        st.caption("Variance Reduction: how many times more plain independent runs the same interval "
+                   "width would take (inf: the method fixes the metric exactly)")
+    if stop_sizes is not None:
+        st.caption("Patients before the C.P. stop rule ended each run")
+        st.bar_chart(stop_sizes, x_label="Patients", y_label="Share of Runs")
+    if alternative:
+        st.markdown("#### ⚖️ Scenario Comparison (common random numbers)")
+        st.caption(f"Alternative: {alternative['service_dist']} service, mean {alternative['mean_service']:g}, "
+                   f"{alternative['servers']} server(s). Differences are alternative - current, with both "
+                   "scenarios of each replication run on the same random numbers.")
+        with stage("Scenario Comparison"):
+            difference = compare(params, alternative, replications, confidence, max_workers)
+        if target:
+            difference = with_target_runs(difference, target, confidence)
+        st.dataframe(difference.style.format(precision=4), width='stretch')
+
+if servers > 1:
+    st.markdown("#### 👥 Per-Server Utilization")
+    st.dataframe(pd.DataFrame({
+        "Server": range(1, servers + 1),
+        "Patients Served": np.bincount(arrays["server"], minlength=servers),
+        "Utilization": np.round(arrays["utilization"], 4)
+    }), width='stretch')
+
+# --- Gantt Chart ---
+st.subheader("📅 Patient Timeline (Gantt Chart)")
+if n:
+    t_end = float(np.ceil(complete_time.max()))
+    window = st.slider("Time Window (minutes)", min_value=0.0, max_value=max(t_end, 1.0),
+                       value=(0.0, max(t_end, 1.0)))
+    with stage("Gantt Chart"):
+        fig, gantt_mode = gantt_figure(arrays["start"], arrays["completion"], arrays["server"],
+                                       window=window, bar_start=arrays["arrival"])
+        if gantt_mode == "servers":
+            st.caption(f"More than {MAX_PATIENT_BARS} patients in view: showing server busy/idle bands. "
+                       "Narrow the time window to see individual patients.")
+        st.plotly_chart(fig, width='stretch')
 
-    # --- Average Stats ---
-    st.markdown("### 📊 Averages Summary")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Avg. Arrival Time", f"{np.mean(arrival_times):.2f}")
-        st.metric("Avg. Service Time", f"{np.mean(service_times):.2f}")
-    with col2:
-        st.metric("Avg. Turnaround Time", f"{np.mean(turnaround_time):.2f}")
-        st.metric("Avg. Waiting Time", f"{np.mean(waiting_time):.2f}")
-    with col3:
-        st.metric("Avg. Response Time", f"{np.mean(response_time):.2f}")
-        st.metric("Utilization", f"{(sum(service_times)/(complete_time[-1]-arrival_times[0])):.2f}")
-
-    # --- Gantt Chart ---
-    st.subheader("📅 Patient Timeline (Gantt Chart)")
-    gantt_data = [{
-        'Task': f'Patient {i+1}',
-        'Start': arrival_times[i],
-        'Finish': complete_time[i],
-        'Resource': 'Service'
-    } for i in range(n)]
-    fig = ff.create_gantt(gantt_data, index_col='Resource', show_colorbar=True, group_tasks=True)
-    st.plotly_chart(fig, width='stretch')
+# --- Real-time Queue Playback ---
 enable_playback = st.checkbox("🎥 Enable Real-Time Playback")
 
 if enable_playback:
-    import time  # ensure this is imported at the top if not already
-
     st.subheader("🕒 Real-Time Queue Simulation")
-    playback = st.empty()
-    for i in range(n):
-        with playback.container():
+    pb_col1, pb_col2 = st.columns(2)
+    with pb_col1:
+        speedup = st.number_input("Speed-up (simulated minutes per second)", min_value=0.1, value=5.0)
+    with pb_col2:
+        max_fps = st.slider("Max UI updates per second", min_value=1, max_value=30, value=5)
+
+    pb_state = st.session_state.setdefault("playback", new_playback_state())
+    # Callbacks change the state before the rerun, so the buttons and the fragment
+    # timer below already reflect it in the same run
+    play_col, pause_col, stop_col = st.columns(3)
+    play_col.button("▶️ Play", disabled=pb_state["running"], on_click=play, args=(pb_state,))
+    pause_col.button("⏸️ Pause", disabled=not pb_state["running"], on_click=pause, args=(pb_state, speedup))
+    stop_col.button("⏹️ Stop", on_click=stop, args=(pb_state,))
+
+    with stage("Playback Timeline"):
+        timeline = build_timeline(arrays["arrival"], arrays["start"], arrays["completion"])
+    max_service = service_times.max() if n else 0.0
+
+    def render_playback():
+        was_running = pb_state["running"]
+        clock = advance(pb_state, speedup, end=timeline["end"])
+        snap = snapshot(timeline, clock)
+
+        st.markdown(f"**Clock:** `{clock:.2f} / {timeline['end']:.2f} min`")
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Arrived", snap["arrived"])
+        c2.metric("Waiting", snap["waiting"])
+        c3.metric("In Service", snap["in_service"])
+        c4.metric("Completed", snap["completed"])
+
+        i = snap["latest"]
+        if i is not None:
             st.markdown(f"#### ▶️ Now Serving: Patient {i+1}")
             st.markdown(f"- Arrival: `{arrival_times[i]} min`\n- Service Start: `{start_time[i]} min`\n- Completion: `{complete_time[i]} min`")
-            st.progress(min(int((service_times[i] / max(service_times)) * 100), 100))
-        time.sleep(0.5)
+            st.progress(min(int((service_times[i] / max_service) * 100), 100) if max_service else 0)
+
+        # The clock reached the end inside this frame: rerun the app to stop the timer
+        if was_running and not pb_state["running"]:
+            st.rerun()
+
+    # Only this fragment reruns on the timer, capped at max_fps, and only while playing
+    st.fragment(render_playback, run_every=1 / max_fps if pb_state["running"] else None)()
 
-    # --- Histograms ---
-    st.subheader("📈 Distribution Histograms")
-    col1, col2 = st.columns(2)
+# --- Histograms ---
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def histogram(params, column, title, color):
+    """PNG of a run's histogram with KDE, rendered once per run (the KDE and rasterizing dominate reruns)"""
+    import io
+
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.subplots()
+    sns.histplot(np.round(expand(simulate(params)[0])[column], 2), kde=True, ax=ax, bins=10, color=color)
+    ax.set_title(title)
+    # The options st.pyplot renders with
+    image = io.BytesIO()
+    fig.savefig(image, format="png", bbox_inches="tight", dpi=200)
+    return image.getvalue()
+
+
+st.subheader("📈 Distribution Histograms")
+col1, col2 = st.columns(2)
+with stage("Histograms"):
     with col1:
-        fig1, ax1 = plt.subplots()
-        sns.histplot(arrival_times, kde=True, ax=ax1, bins=10, color="skyblue")
-        ax1.set_title("Arrival Time")
-        st.pyplot(fig1)
+        st.image(histogram(params, "arrival", "Arrival Time", "skyblue"), width="stretch")
     with col2:
-        fig2, ax2 = plt.subplots()
-        sns.histplot(service_times, kde=True, ax=ax2, bins=10, color="salmon")
-        ax2.set_title("Service Time")
-        st.pyplot(fig2)
-
-    # --- Chi-square Test ---
-    st.subheader("🧪 Chi-Square Goodness-of-Fit")
-
-    def chi_square_test(data, dist_name, mean):
-        observed, bins = np.histogram(data, bins='auto')
-        expected = []
-        for i in range(len(bins)-1):
-            low, high = bins[i], bins[i+1]
-            if dist_name == "Exponential":
-                prob = stats.expon.cdf(high, scale=mean) - stats.expon.cdf(low, scale=mean)
-            elif dist_name == "Poisson":
-                prob = stats.poisson.cdf(high, mu=mean) - stats.poisson.cdf(low, mu=mean)
-            elif dist_name == "Uniform":
-                prob = stats.uniform.cdf(high, loc=mean*0.5, scale=mean) - stats.uniform.cdf(low, loc=mean*0.5, scale=mean)
-            elif dist_name == "Normal":
-                prob = stats.norm.cdf(high, loc=mean, scale=mean*0.3) - stats.norm.cdf(low, loc=mean, scale=mean*0.3)
-            else:
-                prob = 0
-            expected.append(prob)
-
-        expected = np.array(expected) * sum(observed) / np.sum(expected)
-        chi_stat, p = chisquare(observed, expected)
-        return round(chi_stat, 2), round(p, 4), "Accepted" if p > 0.05 else "Rejected"
-
-    a_stat, a_p, a_result = chi_square_test(arrival_times, arrival_dist, mean_arrival)
-    s_stat, s_p, s_result = chi_square_test(service_times, service_dist, mean_service)
-
-    chi_df = pd.DataFrame({
-        "Test": ["Arrival Time", "Service Time"],
-        "Chi-Square": [a_stat, s_stat],
-        "P-Value": [a_p, s_p],
-        "Result": [a_result, s_result]
-    })
-    st.dataframe(chi_df, width='stretch')
-
-    # --- Download ---
-    csv = df.to_csv(index=False).encode('utf-8')
-    st.download_button("📥 Download CSV", csv, "queue_simulation.csv", "text/csv")
-# --- Real-time Queue Playback ---
-# --- Real-time Queue Playback ---
+        st.image(histogram(params, "service", "Service Time", "salmon"), width="stretch")
+
+# --- Chi-square Test ---
+st.subheader("🧪 Goodness-of-Fit")
+fit_method = st.selectbox("Test", FIT_METHODS)
+with stage("Goodness-of-Fit"):
+    fits = fit_table(params, fit_method)
+    st.dataframe(fits, width='stretch')
+    if (fits["Result"] == INSUFFICIENT_DATA).any():
+        st.caption("Too few patients for this test: lengthen the run or turn off the C.P. stop.")
+
+if os.path.exists(WORKBOOK):
+    st.caption("Same distributions fitted to the collected lab data (final lab simulation 01.xlsx)")
+    with stage("Goodness-of-Fit (Lab Data)"):
+        st.dataframe(lab_fit_table(params["arrival_dist"], params["service_dist"], fit_method,
+                                   os.stat(WORKBOOK).st_mtime_ns), width='stretch')
+
+# --- Download ---
+st.subheader("📥 Download")
+export_format = st.radio("Format", list(EXPORT_FORMATS), horizontal=True)
+extension, mime = EXPORT_FORMATS[export_format]
+if st.session_state.get("export") == (params, export_format) or st.button("Prepare export"):
+    st.session_state["export"] = (params, export_format)
+    with stage("Export"):
+        data = export_file(params, export_format)
+    st.download_button(f"📥 Download {export_format}", data, f"queue_simulation.{extension}", mime)
+
+# --- Performance ---
+finish_profile(profile)
+log_profile(profile, page="Simulator", trigger="run" if run_clicked else "rerun", patients=n,
+            seed=params["seed"], source=params["source"], servers=servers, simulation_time=params["simulation_time"])
+with performance_panel:
+    st.caption(f"Last page run: {profile['seconds'] * 1e3:.0f} ms wall, {profile['cpu'] * 1e3:.0f} ms CPU")
+    show_table(pd.DataFrame(profile_rows(profile)))
+    if profile["report"]:
+        st.code(profile["report"], language=None)
@@ -189,9 +189,10 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import plotly.express as px
-import scipy.stats as stats
-import matplotlib.pyplot as plt
+
+from simulator import hand_simulation, lindley
+from simulator.gantt import MAX_PATIENT_BARS, gantt_figure
+from simulator.streams import BIT_GENERATORS, make_rng
 
 st.set_page_config(page_title="Hand Simulation", layout="wide")
 st.title("🧮 Hand Simulation of Queuing System")
@@ -203,68 +204,69 @@ service_dist = st.selectbox("Select Service Time Distribution", dist_options)
 
 mean_arrival = st.number_input("Enter mean inter-arrival time:", min_value=0.1)
 mean_service = st.number_input("Enter mean service time:", min_value=0.1)
+stop_threshold = st.number_input("Stop when cumulative probability reaches:", min_value=0.1, value=1.0)
 
-def get_random(dist, mean, count=1):
-    if dist == "Exponential":
-        return np.random.exponential(mean, count)
-    elif dist == "Poisson":
-        return np.random.poisson(mean, count)
-    elif dist == "Uniform":
-        low = mean * 0.5
-        high = mean * 1.5
-        return np.random.uniform(low, high, count)
-    elif dist == "Normal":
-        return np.random.normal(mean, mean * 0.2, count)
-    else:
-        return np.zeros(count)
+seed = st.number_input("Random seed (0 = new seed each run):", min_value=0, value=0)
+bit_generator = st.selectbox("Random bit generator:", BIT_GENERATORS)
+
+# Results are memoized on the inputs and seed so widget reruns do not re-simulate
+CACHE_ENTRIES = 32
+CACHE_TTL = 3600
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner="Simulating...")
+def run_hand_simulation(params):
+    run_params = {k: v for k, v in params.items() if k not in ("seed", "bit_generator")}
+    customers = hand_simulation(**run_params, rng=make_rng(params["seed"], params["bit_generator"]))
+    queue = lindley(customers["arrival"], customers["service"])
+
+    total_service_time = np.sum(customers["service"])
+    total_time = queue["completion"][-1] - customers["arrival"][0]
+    utilization = total_service_time / total_time
+
+    df = pd.DataFrame({
+        "Customer": list(range(1, len(customers["arrival"]) + 1)),
+        "Arrival Time": customers["arrival"],
+        "Service Time": customers["service"],
+        "Start Time": queue["start"],
+        "Completion Time": queue["completion"],
+        "Waiting Time": queue["waiting"],
+        "Turnaround Time": queue["turnaround"],
+        "Response Time": queue["waiting"]
+    })
+    return customers, df, utilization
 
-def chi_square_test(data, dist, mean, title):
-    st.subheader(f"📈 Chi-Square Goodness of Fit: {title}")
-    num_bins = 10
-    hist, bin_edges = np.histogram(data, bins=num_bins)
-    observed = hist
-
-    if dist == "Exponential":
-        lambda_exp = 1 / mean
-        expected = [
-            len(data) * (stats.expon.cdf(bin_edges[i+1], scale=1/lambda_exp) -
-                         stats.expon.cdf(bin_edges[i], scale=1/lambda_exp))
-            for i in range(len(bin_edges)-1)
-        ]
-    elif dist == "Poisson":
-        expected = [
-            len(data) * (stats.poisson.cdf(bin_edges[i+1], mean) -
-                         stats.poisson.cdf(bin_edges[i], mean))
-            for i in range(len(bin_edges)-1)
-        ]
-    elif dist == "Normal":
-        std = np.std(data)
-        expected = [
-            len(data) * (stats.norm.cdf(bin_edges[i+1], mean, std) -
-                         stats.norm.cdf(bin_edges[i], mean, std))
-            for i in range(len(bin_edges)-1)
-        ]
-    elif dist == "Uniform":
-        a, b = min(data), max(data)
-        expected = [
-            len(data) * (stats.uniform.cdf(bin_edges[i+1], a, b-a) -
-                         stats.uniform.cdf(bin_edges[i], a, b-a))
-            for i in range(len(bin_edges)-1)
-        ]
-    else:
-        expected = [1] * len(observed)
 
-    expected = np.array(expected)
-    expected *= sum(observed) / sum(expected)  # Normalize
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def chi_square_stats(params, sample, dist, mean):
+    from simulator.fit import chi_square
 
-    chi_stat, p_val = stats.chisquare(f_obs=observed, f_exp=expected)
-    df_chi = len(observed) - 1 - 1  # bins - 1 - parameters
-    critical_val = stats.chi2.ppf(0.95, df_chi)
+    customers, _, _ = run_hand_simulation(params)
+    data = customers[sample]
+    # Parameters other than the mean are estimated from the data (one degree of freedom)
+    result = chi_square(data, dist, mean, bins=10, estimate=True, ddof=1)
+    return data, result
+
+
+def chi_square_test(params, sample, default_dist, mean, title):
+    # scipy and matplotlib are only needed once there are results to test
+    from matplotlib.figure import Figure
+    from simulator.fit import FIT_DISTRIBUTIONS
+
+    st.subheader(f"📈 Chi-Square Goodness of Fit: {title}")
+    dist = st.selectbox(f"Fit {title.lower()} to", FIT_DISTRIBUTIONS,
+                        index=FIT_DISTRIBUTIONS.index(default_dist), key=f"fit_{sample}")
+    data, result = chi_square_stats(params, sample, dist, mean)
+    bin_edges, expected = result["bin_edges"], result["expected"]
+    p_val = result["p_value"]
+    if result["dof"] < 1:
+        st.warning("Not enough customers for a chi-square test; raise the stop threshold.")
+        return
 
     # Show results
-    st.write(f"**Chi-Square Statistic:** {chi_stat:.4f}")
-    st.write(f"**Critical Value (α=0.05):** {critical_val:.4f}")
-    st.write(f"**Degrees of Freedom:** {df_chi}")
+    st.write(f"**Chi-Square Statistic:** {result['statistic']:.4f}")
+    st.write(f"**Critical Value (α=0.05):** {result['critical_value']:.4f}")
+    st.write(f"**Degrees of Freedom:** {result['dof']}")
     st.write(f"**P-Value:** {p_val:.4f}")
     if p_val > 0.05:
         st.success("✅ The data fits the distribution (Fail to reject H₀)")
@@ -272,7 +274,8 @@ def chi_square_test(data, dist, mean, title):
         st.error("❌ The data does not fit the distribution (Reject H₀)")
 
     # Plot
-    fig, ax = plt.subplots()
+    fig = Figure()
+    ax = fig.subplots()
     ax.hist(data, bins=bin_edges, alpha=0.6, label="Observed", edgecolor="black")
     ax.plot((bin_edges[:-1] + bin_edges[1:]) / 2, expected, 'ro--', label="Expected")
     ax.set_title(f"{title} Histogram: Observed vs Expected")
@@ -281,98 +284,38 @@ def chi_square_test(data, dist, mean, title):
 
 
 if st.button("Run Simulation"):
-    arrival_times = []
-    service_times = []
-    inter_arrival_times = []
-    cumulative_prob = 0
-    customer = 0
-
-    while cumulative_prob < 1:
-        customer += 1
-        inter_arrival = get_random(arrival_dist, mean_arrival)[0]
-        inter_arrival = max(inter_arrival, 0.01)
-
-        service_time = get_random(service_dist, mean_service)[0]
-        service_time = max(service_time, 0.01)
-
-        inter_arrival_times.append(inter_arrival)
-        service_times.append(service_time)
-        arrival_times.append(np.sum(inter_arrival_times))
-        cumulative_prob += (1 - np.exp(-inter_arrival / mean_arrival))
-
-    num_customers = customer
-    start_service = [0.0] * num_customers
-    completion_time = [0.0] * num_customers
-    waiting_time = [0.0] * num_customers
-    turnaround_time = [0.0] * num_customers
-    response_time = [0.0] * num_customers
-
-    for i in range(num_customers):
-        if i == 0:
-            start_service[i] = arrival_times[i]
-        else:
-            start_service[i] = max(arrival_times[i], completion_time[i - 1])
-        completion_time[i] = start_service[i] + service_times[i]
-        waiting_time[i] = start_service[i] - arrival_times[i]
-        turnaround_time[i] = completion_time[i] - arrival_times[i]
-        response_time[i] = waiting_time[i]
-
-    total_service_time = sum(service_times)
-    total_time = completion_time[-1] - arrival_times[0]
-    utilization = total_service_time / total_time
-
-    df = pd.DataFrame({
-        "Customer": list(range(1, num_customers + 1)),
-        "Arrival Time": arrival_times,
-        "Service Time": service_times,
-        "Start Time": start_service,
-        "Completion Time": completion_time,
-        "Waiting Time": waiting_time,
-        "Turnaround Time": turnaround_time,
-        "Response Time": response_time
-    })
+    st.session_state["hand_params"] = {
+        "arrival_dist": arrival_dist, "mean_arrival": mean_arrival,
+        "service_dist": service_dist, "mean_service": mean_service,
+        "threshold": stop_threshold,
+        "seed": seed or int(np.random.SeedSequence().entropy % 2**63),
+        "bit_generator": bit_generator,
+    }
+
+if "hand_params" in st.session_state:
+    params = st.session_state["hand_params"]
+    customers, df, utilization = run_hand_simulation(params)
+    num_customers = len(df)
+    start_service = df["Start Time"]
+    completion_time = df["Completion Time"]
 
     st.subheader("📋 Simulation Results")
-    st.dataframe(df.style.format(precision=2), width='stretch')
+    st.dataframe(df, width='stretch', column_config={
+        column: st.column_config.NumberColumn(format="%.2f")
+        for column in df.columns if df[column].dtype.kind == "f"
+    })
     st.success(f"✅ Total Customers Simulated: {num_customers}")
     st.info(f"⚙️ Utilization Factor: **{utilization:.2f}**")
 
     # Gantt Chart
-    gantt_data = pd.DataFrame({
-        "Customer": [f"Customer {i+1}" for i in range(num_customers)],
-        "Start": start_service,
-        "Finish": completion_time
-    })
-
     st.subheader("📊 Gantt Chart (Customer Service Timeline)")
-    fig = px.timeline(gantt_data, x_start="Start", x_end="Finish", y="Customer", color="Customer")
-    fig.update_yaxes(autorange="reversed")
+    t_end = float(np.ceil(completion_time.max()))
+    window = st.slider("Time window:", min_value=0.0, max_value=max(t_end, 1.0), value=(0.0, max(t_end, 1.0)))
+    fig, gantt_mode = gantt_figure(start_service, completion_time, window=window, label="Customer")
+    if gantt_mode == "servers":
+        st.caption(f"More than {MAX_PATIENT_BARS} customers in view: showing busy/idle bands.")
     st.plotly_chart(fig, width='stretch')
 
     # Chi-square test for arrival time and service time
-    chi_square_test(inter_arrival_times, arrival_dist, mean_arrival, "Arrival Time")
-    chi_square_test(service_times, service_dist, mean_service, "Service Time")
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    chi_square_test(params, "inter_arrival", params["arrival_dist"], params["mean_arrival"], "Arrival Time")
+    chi_square_test(params, "service", params["service_dist"], params["mean_service"], "Service Time")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the hand-simulation arrival stream.
+
+Raises the cumulative-probability stop threshold so each run generates
+more customers, and compares the streaming generator with the original
+per-customer loop that re-summed the whole inter-arrival history.
+
+    python benchmarks/bench_hand_simulation.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator import hand_simulation  # noqa: E402
+
+THRESHOLDS = [1e2, 1e3, 1e4, 1e5, 1e6]
+LEGACY_LIMIT = 1e4
+
+
+def legacy_hand_simulation(mean_arrival, mean_service, threshold, rng):
+    """The original app1.py.py loop, kept for comparison"""
+    inter_arrival_times = []
+    service_times = []
+    arrival_times = []
+    cumulative_prob = 0
+    while cumulative_prob < threshold:
+        inter_arrival = max(rng.exponential(mean_arrival, 1)[0], 0.01)
+        service_time = max(rng.exponential(mean_service, 1)[0], 0.01)
+        inter_arrival_times.append(inter_arrival)
+        service_times.append(service_time)
+        arrival_times.append(np.sum(inter_arrival_times))
+        cumulative_prob += (1 - np.exp(-inter_arrival / mean_arrival))
+    return arrival_times
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    print(f"{'threshold':>10} {'customers':>10} {'stream (s)':>11} {'ns/customer':>12} {'legacy (s)':>11}")
+    for threshold in THRESHOLDS:
+        rng = np.random.default_rng(0)
+        elapsed, result = timed(hand_simulation, "Exponential", 4.0, "Exponential", 3.0, threshold, rng)
+        customers = len(result["arrival"])
+
+        legacy = "-"
+        if threshold <= LEGACY_LIMIT:
+            legacy_elapsed, _ = timed(legacy_hand_simulation, 4.0, 3.0, threshold, np.random.default_rng(0))
+            legacy = f"{legacy_elapsed:.4f}"
+
+        print(f"{threshold:>10.0e} {customers:>10} {elapsed:>11.4f} {elapsed / customers * 1e9:>12.1f} {legacy:>11}")
+
+
+if __name__ == "__main__":
+    main()
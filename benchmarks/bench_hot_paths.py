@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Timing suite for the computational hot paths at 1e3-1e7 scale.
+
+Covers sampling (`generate_times`, `sample_patients`), the queue kernels
+(`lindley`, multi-server `simulate_servers`), batched C.P.-stop
+replications, `chi_square_test` and the Queuing Calculator formulas
+evaluated over parameter grids. Each case is timed at every size up to
+its own limit, inputs are generated outside the timed region, and the
+best of several repeats is kept.
+
+    python benchmarks/bench_hot_paths.py                    # compare with the baseline
+    python benchmarks/bench_hot_paths.py --max-size 1e5     # quick run
+    python benchmarks/bench_hot_paths.py --save-baseline    # after an intended change
+    python benchmarks/bench_hot_paths.py --output run.json  # keep this run's timings
+
+A timing is a regression when it is more than `--tolerance` slower than
+the baseline and by more than MIN_DELTA seconds. Baselines are machine
+specific: record one on the machine that runs the comparison. Exits with
+status 1 on any regression.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator.analytic import min_servers, model_metrics  # noqa: E402
+from simulator.distributions import generate_times, sample_patients  # noqa: E402
+from simulator.events import simulate_servers  # noqa: E402
+from simulator.fit import chi_square_test  # noqa: E402
+from simulator.kernel import lindley  # noqa: E402
+from simulator.replications import run_cp_replications  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_hot_paths.json")
+SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+TOLERANCE = 0.5
+MIN_DELTA = 0.005
+MIN_TIME = 0.3
+MAX_REPEATS = 7
+
+
+def _queue(n, rng, servers=1):
+    """Arrival and service arrays for a queue at 90% load"""
+    arrival = np.cumsum(rng.exponential(1.0, n))
+    return arrival, rng.exponential(0.9 * servers, n)
+
+
+def _grid(n, rng):
+    """n random (λ, μ, c, σ) points in the Capacity Sweep ranges"""
+    c = rng.integers(1, 51, n).astype(np.float64)
+    mu = rng.uniform(0.5, 5.0, n)
+    return rng.uniform(0.1, 0.99, n) * c * mu, mu, c, rng.uniform(0.0, 1.0, n) / mu
+
+
+CP_PARAMS = {"arrival_dist": "Exponential", "mean_arrival": 4.0, "service_dist": "Exponential",
+             "mean_service": 3.0, "simulation_time": 60.0, "enable_cp": True}
+
+# (name, largest size, setup(n, rng) -> args, function)
+CASES = [
+    ("generate_times Exponential", 10**7, lambda n, rng: ("Exponential", 4.0, n, rng), generate_times),
+    ("generate_times Poisson", 10**7, lambda n, rng: ("Poisson", 4.0, n, rng), generate_times),
+    ("generate_times Normal", 10**7, lambda n, rng: ("Normal", 4.0, n, rng), generate_times),
+    ("sample_patients", 10**7,
+     lambda n, rng: ("Exponential", 1.0, "Exponential", 0.9, float(n), False, rng), sample_patients),
+    ("lindley", 10**7, lambda n, rng: _queue(n, rng), lindley),
+    ("simulate_servers c=4", 10**6, lambda n, rng: (*_queue(n, rng, 4), 4), simulate_servers),
+    ("run_cp_replications", 10**6, lambda n, rng: (CP_PARAMS, n, 0), run_cp_replications),
+    ("chi_square_test", 10**7, lambda n, rng: (rng.exponential(4.0, n), "Exponential", 4.0), chi_square_test),
+    ("model_metrics M/M/c", 10**7, lambda n, rng: ("M/M/c", *_grid(n, rng)[:3]), model_metrics),
+    ("model_metrics G/G/c", 10**7, lambda n, rng: ("G/G/c", *_grid(n, rng), 0.5), model_metrics),
+    ("min_servers M/M/c", 10**5, lambda n, rng: ("M/M/c", *_grid(n, rng)[:2], 0.0, 1.0, 0.5), min_servers),
+]
+
+
+def best_time(func, args):
+    """
+    Best wall time over repeats, stopping once MIN_TIME has been spent.
+
+    An untimed first call absorbs one-time costs: lazy imports (scipy in
+    the fit tests) and page faults on fresh allocations.
+    """
+    func(*args)
+    times = []
+    while len(times) < MAX_REPEATS and sum(times) < MIN_TIME:
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def machine():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def run(max_size, only=None):
+    """Yield (case, size, seconds) for every case and size up to `max_size`"""
+    for name, limit, setup, func in CASES:
+        if only and not any(word.lower() in name.lower() for word in only):
+            continue
+        for n in SIZES:
+            if n > min(limit, max_size):
+                break
+            yield name, n, best_time(func, setup(n, np.random.default_rng(0)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--max-size", type=float, default=SIZES[-1])
+    parser.add_argument("--case", action="append", help="only cases whose name contains this (repeatable)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--output", help="write this run's timings as JSON")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown (0.5 = 50%%)")
+    args = parser.parse_args(argv)
+
+    stored = {"machine": machine(), "results": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        if stored.get("machine") != machine() and not args.save_baseline:
+            print(f"note: baseline was recorded on {stored.get('machine')}", file=sys.stderr)
+    baseline = {} if args.save_baseline else stored["results"]
+
+    report = {"machine": machine(), "results": {}}
+    failures = 0
+    print(f"{'case':<28} {'size':>9} {'time (s)':>10} {'ns/item':>9} {'baseline':>10}  status")
+    for name, n, seconds in run(int(args.max_size), args.case):
+        report["results"].setdefault(name, {})[str(n)] = seconds
+        base = baseline.get(name, {}).get(str(n))
+        if base is None:
+            status, shown = "new", "-"
+        else:
+            slow = seconds > base * (1 + args.tolerance) and seconds - base > MIN_DELTA
+            failures += slow
+            status = f"{'REGRESSION' if slow else 'ok'} ({seconds / base:.2f}x)"
+            shown = f"{base:.4f}"
+        print(f"{name:<28} {n:>9.0e} {seconds:>10.4f} {seconds / n * 1e9:>9.1f} {shown:>10}  {status}", flush=True)
+
+    if args.output:
+        _write_json(args.output, report)
+    if args.save_baseline:
+        # A partial run (--case, --max-size) only replaces the timings it measured
+        for name, timings in report["results"].items():
+            stored["results"].setdefault(name, {}).update(timings)
+        _write_json(args.baseline, {"machine": machine(), "results": stored["results"]})
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Cold-start import budget for the pages and the headless package.
+
+Each target runs in a fresh interpreter under `python -X importtime`.
+Pages are executed once with Streamlit's AppTest, before any simulation
+has been run, and the imports of an empty AppTest script (or, for plain
+code, of an empty interpreter) are subtracted so only what the target
+itself pulls in is counted. Page budgets include NumPy and pandas, which
+Streamlit only imports once a page uses them. A target fails when
+its import time exceeds the budget or when it loads a module that should
+only be imported on first use.
+
+    python benchmarks/bench_startup.py
+
+Exits with status 1 on any regression.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Deferred stacks: loaded only once a chart or test is actually drawn
+DEFERRED = ("matplotlib", "seaborn", "plotly", "scipy")
+
+# (name, code or page path, budget in seconds, modules that must not be imported)
+TARGETS = [
+    ("import simulator", "import simulator", 0.02, DEFERRED + ("numpy", "pandas", "streamlit")),
+    ("simulator run CLI", "import simulator.cli, simulator.engine", 0.30, DEFERRED + ("pandas", "streamlit")),
+    ("Simulator.py", "Simulator.py", 1.00, DEFERRED),
+    ("app1.py.py", "app1.py.py", 1.00, DEFERRED),
+    ("Queuing Calculator", os.path.join("pages", "Queuing Calculator.py"), 1.20, ("matplotlib", "seaborn", "plotly")),
+]
+
+APPTEST = """
+import sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+at.secrets["REDY_AUTH"] = ""
+at.run()
+"""
+
+
+def import_times(code, *args):
+    """{module: self time in µs} for everything imported by `code` in a fresh interpreter"""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code, *args],
+                          capture_output=True, text=True, cwd=ROOT, env=env, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def added_import_times(baseline, code, *args):
+    times = import_times(code, *args)
+    return {name: us for name, us in times.items() if name not in baseline}
+
+
+def main():
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as empty:
+        empty.write("import streamlit as st\n")
+    try:
+        page_baseline = import_times(APPTEST, empty.name)
+    finally:
+        os.unlink(empty.name)
+    code_baseline = import_times("pass")
+
+    failures = 0
+    print(f"{'target':<22} {'modules':>8} {'import (s)':>11} {'budget (s)':>11}  status")
+    for name, target, budget, forbidden in TARGETS:
+        if target.endswith(".py"):
+            times = added_import_times(page_baseline, APPTEST, os.path.join(ROOT, target))
+        else:
+            times = added_import_times(code_baseline, target)
+        seconds = sum(times.values()) / 1e6
+        loaded = sorted({m for m in times if m.split(".")[0] in forbidden and "." not in m})
+        ok = seconds <= budget and not loaded
+        failures += not ok
+        status = "ok" if ok else "REGRESSION"
+        if loaded:
+            status += f" (eager: {', '.join(loaded)})"
+        print(f"{name:<22} {len(times):>8} {seconds:>11.3f} {budget:>11.2f}  {status}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Variance-reduction factors of the replication estimators.
+
+Runs each estimator of `simulator.variance` on a few page-sized
+scenarios and prints, per metric, the reduction factor and the simulated
+patients a 95% interval of TARGET_WIDTH relative half-width needs with
+and without it.
+
+    python benchmarks/bench_variance.py
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator.variance import (CONTROLS, antithetic_replications, compare_scenarios,  # noqa: E402
+                                control_variate_replications, required_replications)
+
+REPLICATIONS = 200
+TARGET_WIDTH = 0.02
+METRICS = ["Avg. Waiting Time", "Utilization"]
+
+BASE = {"arrival_dist": "Exponential", "mean_arrival": 4.0, "service_dist": "Normal", "mean_service": 3.0,
+        "simulation_time": 480.0}
+LONG = {**BASE, "simulation_time": 20000.0}
+
+# (name, patients per replication, table)
+CASES = [
+    ("antithetic", 2 * BASE["simulation_time"] / BASE["mean_arrival"],
+     lambda: antithetic_replications(BASE, REPLICATIONS // 2, seed=0, max_workers=1)),
+    ("control variates", BASE["simulation_time"] / BASE["mean_arrival"],
+     lambda: control_variate_replications(BASE, REPLICATIONS, seed=0, max_workers=1)),
+    ("control variates + M/M/c", LONG["simulation_time"] / LONG["mean_arrival"],
+     lambda: control_variate_replications(LONG, REPLICATIONS // 4, controls=CONTROLS, warmup=0.1, seed=0,
+                                          max_workers=1)),
+    ("CRN Normal vs Exponential", 2 * BASE["simulation_time"] / BASE["mean_arrival"],
+     lambda: compare_scenarios(BASE, {"service_dist": "Exponential"}, REPLICATIONS, seed=0, max_workers=1)),
+    ("CRN 1 vs 2 servers", 2 * BASE["simulation_time"] / BASE["mean_arrival"],
+     lambda: compare_scenarios(BASE, {"servers": 2}, REPLICATIONS, seed=0, max_workers=1)),
+]
+
+
+def main():
+    print(f"{'case':<28} {'metric':<18} {'reduction':>9} {'patients':>12} {'plain':>12}")
+    for name, patients, build in CASES:
+        table = build().set_index("Metric")
+        center = table["Mean"] if "Mean" in table else table["Current"]
+        for metric in METRICS:
+            row = table.loc[metric]
+            runs = required_replications(row["Std. Dev."], TARGET_WIDTH * abs(center[metric]))[0]
+            print(f"{name:<28} {metric:<18} {row['Variance Reduction']:>9.2f} {runs * patients:>12.0f} "
+                  f"{np.ceil(runs * row['Variance Reduction']) * patients:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,72 @@
+import os
+
+import numpy as np
 import streamlit as st
-import streamlit.components.v1 as components
 
-# Load HTML content from file
-with open("graphical.html", "r") as f:
-    html_content = f.read()
+from simulator.gantt import assign_lanes, gantt_html
+from simulator.store import load_results
+
+st.title("📅 Animated Gantt Chart")
+
+CACHE_ENTRIES = 8
+CACHE_TTL = 3600
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def lab_schedule(workbook_mtime):
+    """Recorded times of the lab workbook, with servers inferred from overlapping services"""
+    from simulator.dataset import load_lab_data
+
+    lab = load_lab_data()
+    return lab["arrival"], lab["start"], lab["completion"], assign_lanes(lab["start"], lab["completion"])
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner="Reading trace...")
+def uploaded_schedule(file_id, arrival_column, service_column, servers, _upload):
+    """Queue an uploaded arrival/service trace through `servers` FIFO servers"""
+    from simulator.events import simulate_servers
+    from simulator.trace import read_trace_csv, trace_patients
+
+    trace = read_trace_csv(_upload, service_column, arrival_column=arrival_column)
+    _upload.seek(0)
+    patients = trace_patients(trace)
+    queue = simulate_servers(patients["arrival"], patients["service"], servers)
+    return patients["arrival"], queue["start"], queue["completion"], queue["server"]
+
+
+results = load_results(st.session_state)
+sources = (["Last Simulation"] if results else []) + ["Collected Lab Data", "Uploaded CSV"]
+source = st.radio("Data", sources, horizontal=True)
+
+if source == "Last Simulation":
+    arrays = results["arrays"]
+    arrival, start, completion, server = arrays["arrival"], arrays["start"], arrays["completion"], arrays["server"]
+    st.caption(f"{len(arrival)} patients from the last run on the Simulator page (seed {results['params']['seed']}).")
+elif source == "Collected Lab Data":
+    from simulator.dataset import WORKBOOK
+
+    arrival, start, completion, server = lab_schedule(os.stat(WORKBOOK).st_mtime_ns)
+    st.caption("Recorded times from final lab simulation 01.xlsx; servers are inferred from overlapping services.")
+else:
+    upload = st.file_uploader("CSV with arrival and service times", type="csv")
+    if upload is None:
+        st.info("Upload a CSV to draw its Gantt chart.")
+        st.stop()
+    import pandas as pd
+
+    columns = pd.read_csv(upload, nrows=0).columns.tolist()
+    upload.seek(0)
+    col1, col2, col3 = st.columns(3)
+    arrival_column = col1.selectbox("Arrival Time Column", columns)
+    service_column = col2.selectbox("Service Time Column", columns, index=min(1, len(columns) - 1))
+    servers = col3.number_input("Servers", min_value=1, value=1)
+    arrival, start, completion, server = uploaded_schedule(upload.file_id, arrival_column, service_column,
+                                                           servers, upload)
+
+if len(arrival) == 0:
+    st.warning("No patients to draw.")
+    st.stop()
 
-# Render HTML in Streamlit
-components.html(html_content, height=1000)
+lanes = int(np.max(server)) + 1
+# The chart is our own template with the schedule inlined, so it is safe to embed as an HTML string
+st.iframe(gantt_html(arrival, start, completion, server), height=24 + 34 * lanes + 160)
@@ -1,62 +1,90 @@
 import streamlit as st
-import math
-
-def factorial(n):
-    return math.factorial(n)
-
-# M/M/1 Model
-def mm1_p0(rho):
-    return 1 - rho
-
-def mm1_lq(lambda_, mu):
-    rho = lambda_ / mu
-    return (rho ** 2) / (1 - rho)
-
-def mm1_pn(rho, n):
-    return (1 - rho) * (rho ** n)
-
-def mm1_wq(lq, lambda_):
-    return lq / lambda_
-
-# M/G/1 Model
-def mg1_lq(lambda_, mu, sigma):
-    rho = lambda_ / mu
-    return (lambda_**2 * sigma**2 + rho**2) / (2 * (1 - rho))
-
-# M/M/c Model
-def calculate_p0_mmc(lambda_, mu, c):
-    rho = lambda_ / (c * mu)
-    sum_term = sum((lambda_ / mu) ** n / factorial(n) for n in range(c))
-    sum_term += ((lambda_ / mu) ** c / (factorial(c) * (1 - rho)))
-    return 1 / sum_term
-
-def calculate_lq_mmc(lambda_, mu, c, p0):
-    rho = lambda_ / (c * mu)
-    return (p0 * (lambda_ / mu) ** c * rho) / (factorial(c) * (1 - rho) ** 2)
-
-# M/G/c Model
-def calculate_lq_mgc(lambda_, mu, c, sigma, p0):
-    lq_mmc = calculate_lq_mmc(lambda_, mu, c, p0)
-    c_s2 = (sigma ** 2) * (mu ** 2)
-    return ((c_s2 + 1) * lq_mmc) / 2
-
-# G/G/c Model
-def calculate_lq_ggc(lambda_, mu, c, sigma, ca):
-    p0 = calculate_p0_mmc(lambda_, mu, c)
-    lq_mmc = calculate_lq_mmc(lambda_, mu, c, p0)
-    c_s2 = (sigma ** 2) * (mu ** 2)
-    return (lambda_ / mu) ** 2 * (ca ** 2 + c_s2) / (2 * (1 - (lambda_ / (c * mu)))) * lq_mmc
-
-# General formulas
-def calculate_ws(wq, mu):
-    return wq + (1 / mu)
-
-def calculate_ls(lq, lambda_, mu):
-    return lq + (lambda_ / mu)
+import numpy as np
+import pandas as pd
+
+from simulator.analytic import (
+    SWEEP_MODELS,
+    calculate_lq_ggc,
+    calculate_lq_mgc,
+    calculate_lq_mmc,
+    calculate_ls,
+    calculate_p0_mmc,
+    calculate_ws,
+    mg1_lq,
+    mm1_lq,
+    mm1_p0,
+    mm1_pn,
+    mm1_wq,
+    min_servers,
+    model_metrics,
+)
 
 # Streamlit UI
 st.title("Queueing Model Calculator")
 
+mode = st.radio("Mode:", ("Single Point", "Capacity Sweep"), horizontal=True)
+
+if mode == "Capacity Sweep":
+    import plotly.graph_objects as go
+
+    st.write("Evaluate a whole (λ × c × σ) grid at once and find the fewest servers that meet a target.")
+    sweep_model = st.radio("Select Queueing Model:", SWEEP_MODELS, horizontal=True)
+    mu = st.number_input("Service Rate (μ):", min_value=0.001, value=1.0)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        lambda_min = st.number_input("λ from:", min_value=0.001, value=1.0)
+        lambda_max = st.number_input("λ to:", min_value=0.001, value=100.0)
+        lambda_steps = st.number_input("λ steps:", min_value=1, value=200)
+    with col2:
+        c_min = st.number_input("c from:", min_value=1, value=1)
+        c_max = st.number_input("c to:", min_value=1, value=150)
+    with col3:
+        if sweep_model != "M/M/c":
+            sigma_min = st.number_input("σ from:", min_value=0.0, value=0.0)
+            sigma_max = st.number_input("σ to:", min_value=0.0, value=2.0)
+            sigma_steps = st.number_input("σ steps:", min_value=1, value=5)
+        else:
+            sigma_min = sigma_max = 0.0
+            sigma_steps = 1
+        ca = st.number_input("Cₐ²:", min_value=0.0, value=1.0) if sweep_model == "G/G/c" else 1.0
+
+    lambdas = np.linspace(lambda_min, lambda_max, int(lambda_steps))
+    servers = np.arange(int(c_min), int(c_max) + 1)
+    sigmas = np.linspace(sigma_min, sigma_max, int(sigma_steps))
+    st.caption(f"Grid size: {lambdas.size * servers.size * sigmas.size:,} points")
+
+    grid = model_metrics(sweep_model, lambdas[:, None, None], mu, servers[None, :, None],
+                         sigmas[None, None, :], ca)
+
+    metric_labels = {"wq": "Wq", "ws": "Ws", "lq": "Lq", "ls": "Ls", "p0": "P₀", "rho": "ρ"}
+    metric = st.selectbox("Heatmap metric:", list(metric_labels), format_func=metric_labels.get)
+    sigma_index = 0
+    if sigmas.size > 1:
+        sigma_index = st.select_slider("σ slice:", options=list(range(sigmas.size)),
+                                       format_func=lambda i: f"{sigmas[i]:.3f}")
+    fig = go.Figure(go.Heatmap(x=lambdas, y=servers, z=grid[metric][:, :, sigma_index].T,
+                               colorscale="Viridis", colorbar={"title": metric_labels[metric]}))
+    fig.update_layout(xaxis_title="Arrival Rate (λ)", yaxis_title="Servers (c)",
+                      title=f"{metric_labels[metric]} for {sweep_model} (unstable points blank)")
+    st.plotly_chart(fig, width='stretch')
+
+    st.subheader("Minimum Servers")
+    col1, col2 = st.columns(2)
+    with col1:
+        target_wq = st.number_input("Target Wq (0 = no target):", min_value=0.0, value=0.1)
+    with col2:
+        target_rho = st.number_input("Maximum ρ (1 = no target):", min_value=0.01, max_value=1.0, value=0.85)
+    needed = min_servers(sweep_model, lambdas[:, None], mu, sigmas[None, :], ca,
+                         max_wq=target_wq or None, max_rho=target_rho if target_rho < 1 else None)
+    fig = go.Figure([go.Scatter(x=lambdas, y=needed[:, k], mode="lines", name=f"σ = {sigma:.3f}", line_shape="hv")
+                     for k, sigma in enumerate(sigmas)])
+    fig.update_layout(xaxis_title="Arrival Rate (λ)", yaxis_title="Minimum servers (c)")
+    st.plotly_chart(fig, width='stretch')
+    st.dataframe(pd.DataFrame(needed, index=pd.Index(np.round(lambdas, 4), name="λ"),
+                              columns=[f"σ = {sigma:.3f}" for sigma in sigmas]), width='stretch')
+    st.stop()
+
 queue_model = st.radio("Select Queueing Model:", ("M/M/1", "M/G/1", "M/M/c", "M/G/c", "G/G/c"))
 
 lambda_ = st.number_input("Enter Arrival Rate (λ):", min_value=0.1, value=5.0)
@@ -99,7 +127,7 @@ if st.button("Calculate"):
 
         elif queue_model == "M/M/c":
             p0 = calculate_p0_mmc(lambda_, mu, c)
-            lq = calculate_lq_mmc(lambda_, mu, c, p0)
+            lq = calculate_lq_mmc(lambda_, mu, c)
             wq = mm1_wq(lq, lambda_)
             ws = calculate_ws(wq, mu)
             ls = calculate_ls(lq, lambda_, mu)
@@ -108,7 +136,7 @@ if st.button("Calculate"):
 
         elif queue_model == "M/G/c":
             p0 = calculate_p0_mmc(lambda_, mu, c)
-            lq = calculate_lq_mgc(lambda_, mu, c, sigma, p0)
+            lq = calculate_lq_mgc(lambda_, mu, c, sigma)
             wq = mm1_wq(lq, lambda_)
             ws = calculate_ws(wq, mu)
             ls = calculate_ls(lq, lambda_, mu)
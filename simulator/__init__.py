@@ -0,0 +1,57 @@
+"""
+Core computation package for the Patient Queue Simulator pages.
+
+Nothing here imports Streamlit or a plotting library, and the public
+names below are resolved lazily on first access, so `import simulator`
+only costs what the submodules actually used pull in. The command-line
+entry point is `python -m simulator`.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "DISCIPLINES": "simulator.events",
+    "DISTRIBUTIONS": "simulator.distributions",
+    "antithetic_replications": "simulator.variance",
+    "arrival_stream": "simulator.hand",
+    "chi_square": "simulator.fit",
+    "chi_square_test": "simulator.fit",
+    "compact": "simulator.engine",
+    "compare_scenarios": "simulator.variance",
+    "confidence_intervals": "simulator.replications",
+    "control_variate_replications": "simulator.variance",
+    "crn_streams": "simulator.streams",
+    "describe": "simulator.engine",
+    "erlang_c": "simulator.analytic",
+    "expand": "simulator.engine",
+    "generate_times": "simulator.distributions",
+    "get_cdf": "simulator.distributions",
+    "goodness_of_fit": "simulator.fit",
+    "hand_simulation": "simulator.hand",
+    "lindley": "simulator.kernel",
+    "make_rng": "simulator.streams",
+    "mmc_metrics": "simulator.analytic",
+    "required_replications": "simulator.variance",
+    "results_frame": "simulator.engine",
+    "run_cp_replications": "simulator.replications",
+    "run_replications": "simulator.replications",
+    "run_simulation": "simulator.engine",
+    "sample_patients": "simulator.distributions",
+    "simulate_servers": "simulator.events",
+    "slice_result": "simulator.engine",
+    "summarize": "simulator.engine",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'simulator' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
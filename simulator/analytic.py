@@ -0,0 +1,194 @@
+"""
+Closed-form queueing formulas used by the Queuing Calculator page.
+
+The M/M/c quantities are computed in log space from the Poisson
+distribution instead of summing (λ/μ)^n / n! term by term: with
+A = λ/μ the Erlang B blocking probability is
+
+    B(c, A) = pmf(c; A) / cdf(c; A)
+
+for a Poisson(A) variable, and Erlang C, P₀ and Lq follow from B. This
+never overflows, stays accurate for thousands of servers, costs O(1)
+per point, and every function broadcasts over NumPy arrays of λ, μ and c.
+"""
+
+import numpy as np
+from scipy import special
+
+
+# M/M/1 Model
+def mm1_p0(rho):
+    return 1 - rho
+
+
+def mm1_lq(lambda_, mu):
+    rho = lambda_ / mu
+    return (rho ** 2) / (1 - rho)
+
+
+def mm1_pn(rho, n):
+    return (1 - rho) * (rho ** n)
+
+
+def mm1_wq(lq, lambda_):
+    return lq / lambda_
+
+
+# M/G/1 Model
+def mg1_lq(lambda_, mu, sigma):
+    rho = lambda_ / mu
+    return (lambda_**2 * sigma**2 + rho**2) / (2 * (1 - rho))
+
+
+# M/M/c Model
+def log_poisson_pmf(n, a):
+    return special.xlogy(n, a) - a - special.gammaln(n + 1)
+
+
+def log_poisson_cdf(n, a):
+    with np.errstate(divide="ignore"):
+        return np.log(special.pdtr(n, a))
+
+
+def log_erlang_b(c, a):
+    """log of the Erlang B blocking probability for c servers and offered load a"""
+    return log_poisson_pmf(c, a) - log_poisson_cdf(c, a)
+
+
+def erlang_c(lambda_, mu, c):
+    """Probability that an arriving customer has to wait (Erlang C)"""
+    lambda_, mu, c = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, c)))
+    a = lambda_ / mu
+    rho = a / c
+    b = np.exp(log_erlang_b(c, a))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(rho < 1, b / (1 - rho * (1 - b)), np.nan)[()]
+
+
+def calculate_p0_mmc(lambda_, mu, c):
+    """
+    Probability of an empty M/M/c system.
+
+    1 / P₀ = Σ_{n<c} Aⁿ/n! + A^c / (c! (1 - ρ)) = e^A cdf(c; A) (1 + B ρ / (1 - ρ))
+    """
+    lambda_, mu, c = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, c)))
+    a = lambda_ / mu
+    rho = a / c
+    b = np.exp(log_erlang_b(c, a))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_p0 = -a - log_poisson_cdf(c, a) - np.log1p(b * rho / (1 - rho))
+        return np.where(rho < 1, np.exp(log_p0), np.nan)[()]
+
+
+def calculate_lq_mmc(lambda_, mu, c):
+    """Mean M/M/c queue length, Lq = C(c, A) ρ / (1 - ρ)"""
+    rho = np.asarray(lambda_, dtype=np.float64) / (np.asarray(c) * np.asarray(mu, dtype=np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return erlang_c(lambda_, mu, c) * rho / (1 - rho)
+
+
+# M/G/c Model
+def calculate_lq_mgc(lambda_, mu, c, sigma):
+    lq_mmc = calculate_lq_mmc(lambda_, mu, c)
+    c_s2 = (sigma ** 2) * (mu ** 2)
+    return ((c_s2 + 1) * lq_mmc) / 2
+
+
+# G/G/c Model
+def calculate_lq_ggc(lambda_, mu, c, sigma, ca):
+    """Allen-Cunneen approximation, Lq ≈ Lq(M/M/c) (Cₐ² + Cₛ²) / 2, with `ca` = Cₐ²"""
+    lq_mmc = calculate_lq_mmc(lambda_, mu, c)
+    c_s2 = (sigma ** 2) * (mu ** 2)
+    return ((ca + c_s2) * lq_mmc) / 2
+
+
+# General formulas
+def calculate_ws(wq, mu):
+    return wq + (1 / mu)
+
+
+def calculate_ls(lq, lambda_, mu):
+    return lq + (lambda_ / mu)
+
+
+def mmc_metrics(lambda_, mu, c):
+    """Every M/M/c steady-state metric at once; accepts scalars or broadcastable arrays"""
+    lambda_, mu, c = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, c)))
+    lq = calculate_lq_mmc(lambda_, mu, c)
+    wq = mm1_wq(lq, lambda_)
+    return {
+        "rho": lambda_ / (c * mu),
+        "p0": calculate_p0_mmc(lambda_, mu, c),
+        "erlang_c": erlang_c(lambda_, mu, c),
+        "lq": lq,
+        "wq": wq,
+        "ws": calculate_ws(wq, mu),
+        "ls": calculate_ls(lq, lambda_, mu),
+    }
+
+
+# Capacity planning
+SWEEP_MODELS = ["M/M/c", "M/G/c", "G/G/c"]
+
+
+def model_metrics(model, lambda_, mu, c, sigma=0.0, ca=1.0):
+    """
+    Steady-state metrics for one of SWEEP_MODELS over broadcast parameter grids.
+
+    Unstable points (ρ ≥ 1) come back as NaN rather than raising, so whole
+    grids can be evaluated in one call.
+    """
+    lambda_, mu, c, sigma, ca = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, c, sigma, ca)))
+    if model not in SWEEP_MODELS:
+        raise ValueError(f"Unknown queueing model: {model}")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if model == "M/M/c":
+            lq = calculate_lq_mmc(lambda_, mu, c)
+        elif model == "M/G/c":
+            lq = calculate_lq_mgc(lambda_, mu, c, sigma)
+        else:
+            lq = calculate_lq_ggc(lambda_, mu, c, sigma, ca)
+    rho = lambda_ / (c * mu)
+    lq = np.where(rho < 1, lq, np.nan)
+    wq = mm1_wq(lq, lambda_)
+    return {
+        "rho": rho,
+        "p0": calculate_p0_mmc(lambda_, mu, c),
+        "lq": lq,
+        "wq": wq,
+        "ws": calculate_ws(wq, mu),
+        "ls": calculate_ls(lq, lambda_, mu),
+    }
+
+
+def min_servers(model, lambda_, mu, sigma=0.0, ca=1.0, max_wq=None, max_rho=None, c_max=100000):
+    """
+    Smallest c with ρ < 1, Wq ≤ max_wq and ρ ≤ max_rho, for every point of a parameter grid.
+
+    Both conditions only get easier as c grows, so the answer is found by
+    a bisection run on all points at once (about log2(c_max) grid
+    evaluations). Points that need more than `c_max` servers are NaN.
+    """
+    lambda_, mu, sigma, ca = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, sigma, ca)))
+
+    def feasible(c):
+        m = model_metrics(model, lambda_, mu, c, sigma, ca)
+        ok = m["rho"] < 1
+        if max_wq is not None:
+            ok &= m["wq"] <= max_wq
+        if max_rho is not None:
+            ok &= m["rho"] <= max_rho
+        return ok
+
+    # c = floor(λ/μ) always has ρ ≥ 1, so it is a valid infeasible lower bound
+    lo = np.floor(lambda_ / mu)
+    hi = np.full(lambda_.shape, float(c_max))
+    reachable = feasible(hi)
+    while np.any(hi - lo > 1):
+        mid = np.floor((lo + hi) / 2)
+        ok = feasible(np.maximum(mid, 1))
+        hi = np.where(ok, mid, hi)
+        lo = np.where(ok, lo, mid)
+    return np.where(reachable, hi, np.nan)
@@ -0,0 +1,254 @@
+"""
+Command-line entry point for batch runs without the Streamlit UI.
+
+    python -m simulator run --arrival Exponential --mean-arrival 4 \\
+        --service Exponential --mean-service 3 --time 480 --output run.csv
+    python -m simulator replicate --replications 200 --workers 4 --output ci.csv
+    python -m simulator replicate --variance-reduction control --time 5000 --warmup 0.1
+    python -m simulator compare --service Exponential --alt-service Normal --replications 100
+    python -m simulator run --service Normal --seed 7 --crn --bit-generator Philox
+    python -m simulator analytic --model M/M/c --lam 10 --mu 4 --servers 3
+    python -m simulator validate --horizon 200000
+    python -m simulator lab-data
+    python -m simulator trace --mode Bootstrap --time 10000 --servers 16
+    python -m simulator trace --csv visits.csv --arrival-column arrived --service-column minutes
+
+Summaries are printed to stdout as strict JSON (undefined values such as
+the averages of an empty run are null); per-patient results are written
+to `--output` as CSV (the Simulator page table, streamed in chunks),
+zstd-compressed `.parquet` or compressed `.npz` arrays. Only NumPy is
+imported for a plain run; pandas and scipy are loaded by the sub-commands
+that need them.
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from simulator.distributions import DISTRIBUTIONS
+from simulator.events import DISCIPLINES
+from simulator.streams import BIT_GENERATORS
+from simulator.trace import TRACE_MODES
+from simulator.variance import CONTROLS, DEFAULT_CONTROLS
+
+
+def _add_run_arguments(parser):
+    parser.add_argument("--arrival", choices=DISTRIBUTIONS, default="Exponential")
+    parser.add_argument("--mean-arrival", type=float, default=4.0)
+    parser.add_argument("--service", choices=DISTRIBUTIONS, default="Exponential")
+    parser.add_argument("--mean-service", type=float, default=3.0)
+    parser.add_argument("--time", type=float, default=60.0, help="simulation time in minutes")
+    parser.add_argument("--cp", action="store_true", help="stop on the cumulative-probability rule")
+    parser.add_argument("--servers", type=int, default=1)
+    parser.add_argument("--discipline", choices=DISCIPLINES, default="FIFO")
+    parser.add_argument("--priority-levels", type=int, default=1)
+    _add_rng_arguments(parser)
+
+
+def _add_rng_arguments(parser):
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--bit-generator", choices=BIT_GENERATORS, default="PCG64")
+    parser.add_argument("--crn", action="store_true", help="common random numbers: one stream per purpose")
+
+
+def _rng(args):
+    from simulator.streams import run_rng
+    return run_rng(args.seed, args.bit_generator, args.crn)
+
+
+def _run_params(args):
+    return {
+        "arrival_dist": args.arrival,
+        "mean_arrival": args.mean_arrival,
+        "service_dist": args.service,
+        "mean_service": args.mean_service,
+        "simulation_time": args.time,
+        "enable_cp": args.cp,
+        "servers": args.servers,
+        "discipline": args.discipline,
+        "priority_levels": args.priority_levels,
+    }
+
+
+def _write_run(result, path):
+    if path.endswith(".npz"):
+        np.savez_compressed(path, **{k: v for k, v in result.items() if v is not None})
+    elif path.endswith(".parquet"):
+        from simulator.export import write_parquet
+        write_parquet(result, path)
+    else:
+        from simulator.export import write_csv
+        write_csv(result, path)
+
+
+def _finite(value):
+    """`value` with every NaN or infinite float replaced by None, so the output is strict JSON"""
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    if isinstance(value, (float, np.floating)):
+        return float(value) if np.isfinite(value) else None
+    return value
+
+
+def _print_json(data):
+    print(json.dumps(_finite(data), indent=2, default=float, allow_nan=False))
+
+
+def run(args):
+    from simulator.engine import run_simulation, summarize
+
+    result = run_simulation(**_run_params(args), rng=_rng(args))
+    if args.output:
+        _write_run(result, args.output)
+    _print_json(summarize(result))
+    return 0
+
+
+def _write_table(table, args):
+    if args.output:
+        table.to_csv(args.output, index=False)
+    _print_json(table.set_index("Metric").to_dict(orient="index"))
+    return 0
+
+
+def replicate(args):
+    from simulator.replications import confidence_intervals, run_cp_replications, run_replications
+    from simulator.variance import antithetic_replications, control_variate_replications
+
+    params = _run_params(args)
+    if args.variance_reduction == "antithetic":
+        return _write_table(antithetic_replications(params, max(2, args.replications // 2), args.confidence,
+                                                    args.seed, args.workers, args.bit_generator), args)
+    if args.variance_reduction == "control":
+        return _write_table(control_variate_replications(params, args.replications, args.confidence,
+                                                         args.controls or DEFAULT_CONTROLS, args.warmup, args.seed,
+                                                         args.workers, args.bit_generator), args)
+    if args.cp and args.discipline == "FIFO":
+        runs = run_cp_replications(params, args.replications, args.seed, bit_generator=args.bit_generator)
+    else:
+        runs = run_replications(params, args.replications, args.seed, args.workers, args.bit_generator, args.crn)
+    return _write_table(confidence_intervals(runs, args.confidence), args)
+
+
+def compare(args):
+    from simulator.variance import compare_scenarios
+
+    changes = {"service_dist": args.alt_service, "mean_service": args.alt_mean_service, "servers": args.alt_servers,
+               "discipline": args.alt_discipline}
+    alternative = {key: value for key, value in changes.items() if value is not None}
+    return _write_table(compare_scenarios(_run_params(args), alternative, args.replications, args.confidence,
+                                          args.seed, args.workers, args.bit_generator), args)
+
+
+def analytic(args):
+    from simulator.analytic import model_metrics
+
+    metrics = model_metrics(args.model, args.lam, args.mu, args.servers, args.sigma, args.ca)
+    _print_json({key: float(value) for key, value in metrics.items()})
+    return 0
+
+
+def lab_data(args):
+    from simulator.dataset import WORKBOOK, load_lab_data
+
+    data = load_lab_data(args.workbook or WORKBOOK)
+    _print_json({name: {"count": len(values), "mean": values.mean() if len(values) else None}
+                 for name, values in data.items()})
+    return 0
+
+
+def trace(args):
+    from simulator.engine import summarize
+    from simulator.trace import lab_trace, read_trace_csv, run_trace
+
+    if args.mode != "Replay" and args.time is None:
+        raise SystemExit(f"--mode {args.mode} needs --time")
+    if args.csv:
+        if not (args.arrival_column or args.inter_arrival_column):
+            raise SystemExit("--csv needs --arrival-column or --inter-arrival-column")
+        data = read_trace_csv(args.csv, args.service_column, args.inter_arrival_column, args.arrival_column)
+    else:
+        data = lab_trace()
+    try:
+        result = run_trace(data, args.mode, args.time, args.servers, args.discipline, args.priority_levels,
+                           _rng(args))
+    except ValueError as error:
+        raise SystemExit(str(error))
+    if args.output:
+        _write_run(result, args.output)
+    _print_json(summarize(result))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulator", description="Patient queue simulator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="simulate one configuration")
+    _add_run_arguments(run_parser)
+    run_parser.add_argument("--output", help="per-patient results (.csv, .parquet or .npz)")
+
+    rep_parser = commands.add_parser("replicate", help="independent replications with confidence intervals")
+    _add_run_arguments(rep_parser)
+    rep_parser.add_argument("--replications", type=int, default=30)
+    rep_parser.add_argument("--confidence", type=float, default=0.95)
+    rep_parser.add_argument("--workers", type=int, default=None)
+    rep_parser.add_argument("--variance-reduction", choices=["antithetic", "control"],
+                            help="antithetic pairs (replications // 2 of them) or control variates")
+    rep_parser.add_argument("--controls", nargs="+", choices=CONTROLS, help="control variates to use")
+    rep_parser.add_argument("--warmup", type=float, default=0.0, help="share of the horizon left out (controls)")
+    rep_parser.add_argument("--output", help="confidence interval table (.csv)")
+
+    compare_parser = commands.add_parser("compare", help="alternative - current on common random numbers")
+    _add_run_arguments(compare_parser)
+    compare_parser.add_argument("--alt-service", choices=DISTRIBUTIONS)
+    compare_parser.add_argument("--alt-mean-service", type=float)
+    compare_parser.add_argument("--alt-servers", type=int)
+    compare_parser.add_argument("--alt-discipline", choices=DISCIPLINES)
+    compare_parser.add_argument("--replications", type=int, default=30)
+    compare_parser.add_argument("--confidence", type=float, default=0.95)
+    compare_parser.add_argument("--workers", type=int, default=None)
+    compare_parser.add_argument("--output", help="difference interval table (.csv)")
+
+    analytic_parser = commands.add_parser("analytic", help="closed-form steady-state metrics")
+    analytic_parser.add_argument("--model", choices=["M/M/c", "M/G/c", "G/G/c"], default="M/M/c")
+    analytic_parser.add_argument("--lam", type=float, required=True, help="arrival rate λ")
+    analytic_parser.add_argument("--mu", type=float, required=True, help="service rate μ per server")
+    analytic_parser.add_argument("--servers", type=int, default=1)
+    analytic_parser.add_argument("--sigma", type=float, default=0.0, help="service time standard deviation")
+    analytic_parser.add_argument("--ca", type=float, default=1.0, help="arrival Cₐ² (G/G/c)")
+
+    lab_parser = commands.add_parser("lab-data", help="load (and cache) the collected lab workbook")
+    lab_parser.add_argument("--workbook", help="path to the .xlsx file")
+
+    trace_parser = commands.add_parser("trace", help="trace-driven run from the lab data or a CSV")
+    trace_parser.add_argument("--csv", help="trace CSV (default: the lab workbook)")
+    trace_parser.add_argument("--service-column", default="service")
+    trace_parser.add_argument("--arrival-column", help="absolute arrival times")
+    trace_parser.add_argument("--inter-arrival-column")
+    trace_parser.add_argument("--mode", choices=TRACE_MODES, default="Replay")
+    trace_parser.add_argument("--time", type=float, default=None, help="horizon in minutes (required to resample)")
+    trace_parser.add_argument("--servers", type=int, default=1)
+    trace_parser.add_argument("--discipline", choices=DISCIPLINES, default="FIFO")
+    trace_parser.add_argument("--priority-levels", type=int, default=1)
+    _add_rng_arguments(trace_parser)
+    trace_parser.add_argument("--output", help="per-patient results (.csv, .parquet or .npz)")
+
+    commands.add_parser("validate", add_help=False, help="compare simulation with the analytic formulas")
+
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "validate":
+        from simulator import validation
+        return validation.main(extra)
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return {"run": run, "replicate": replicate, "compare": compare, "analytic": analytic, "lab-data": lab_data,
+            "trace": trace}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Collected lab data from "final lab simulation 01.xlsx".
+
+The workbook is parsed with openpyxl once and the patient table is
+written to a NumPy .npz cache next to it. Later loads read the cache
+directly as typed arrays. The cache is stamped with the workbook's
+mtime, size and SHA-256: a changed mtime or size triggers a hash check,
+and the workbook is only parsed again when its content really changed.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKBOOK = os.path.join(ROOT, "final lab simulation 01.xlsx")
+CACHE_DIR = os.path.join(ROOT, ".cache")
+CACHE_VERSION = 1
+
+SHEET = "Sheet1"
+# Workbook header (whitespace stripped) -> array name, all in minutes
+COLUMNS = {
+    "P#": "patient",
+    "Arrival Time(Poisson)": "arrival",
+    "Service Start Time(Integer)": "start",
+    "Service End Time(Integer)": "completion",
+    "Service Time (Exponential)": "service",
+    "Turn Around Time": "turnaround",
+    "Wait Time": "waiting",
+    "Response Time": "response",
+}
+# Column N holds a separate, sorted inter-arrival sample used for the XLSTAT fits
+SAMPLE_COLUMN = "inter arrival"
+
+
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_workbook(path=WORKBOOK):
+    """Parse the patient table straight from the workbook (slow; prefer `load_lab_data`)"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[SHEET].iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else None for h in next(rows)]
+        index = {name: header.index(column) for column, name in COLUMNS.items()}
+        sample_index = header.index(SAMPLE_COLUMN)
+
+        table = {name: [] for name in COLUMNS.values()}
+        sample = []
+        for row in rows:
+            if row[index["patient"]] is None:
+                continue
+            for name, i in index.items():
+                table[name].append(row[i])
+            if row[sample_index] is not None:
+                sample.append(row[sample_index])
+    finally:
+        workbook.close()
+
+    data = {name: np.asarray(values, dtype=np.float64) for name, values in table.items()}
+    data["patient"] = data["patient"].astype(np.int64)
+    data["inter_arrival_sample"] = np.asarray(sample, dtype=np.float64)
+    return data
+
+
+def _derived(data):
+    """Arrays computed from the cached columns rather than stored"""
+    return {**data, "inter_arrival": np.diff(data["arrival"])}
+
+
+def load_lab_data(path=WORKBOOK, cache_dir=CACHE_DIR):
+    """
+    Patient table of the lab workbook as a dict of typed NumPy arrays.
+
+    Keys are those of COLUMNS plus "inter_arrival" (differences of the
+    arrival clock) and "inter_arrival_sample". If the cache directory is
+    not writable the workbook is simply parsed on every call.
+    """
+    stat = os.stat(path)
+    stamp = np.array([CACHE_VERSION, stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+    cache = os.path.join(cache_dir, os.path.splitext(os.path.basename(path))[0] + ".npz")
+
+    digest = None
+    cached = _read_cache(cache)
+    if cached is not None:
+        data, cached_stamp, cached_digest = cached
+        if np.array_equal(cached_stamp, stamp):
+            return _derived(data)
+        digest = _sha256(path)
+        if cached_stamp[0] == CACHE_VERSION and cached_digest == digest:
+            # Touched but unchanged: refresh the stamp without re-parsing
+            _write_cache(cache, data, stamp, digest)
+            return _derived(data)
+
+    data = read_workbook(path)
+    _write_cache(cache, data, stamp, digest or _sha256(path))
+    return _derived(data)
+
+
+def _read_cache(cache):
+    """(arrays, stamp, digest) from an existing cache, or None if it is missing or unreadable"""
+    try:
+        with np.load(cache) as cached:
+            data = {name: cached[name] for name in cached.files if not name.startswith("_")}
+            return data, cached["_stamp"], str(cached["_sha256"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _write_cache(cache, data, stamp, digest):
+    tmp = f"{cache}.{os.getpid()}.tmp.npz"
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        np.savez(tmp, _stamp=stamp, _sha256=np.array(digest), **data)
+        # Atomic swap so concurrent sessions never read a half-written cache
+        os.replace(tmp, cache)
+    except OSError:
+        pass
@@ -0,0 +1,66 @@
+"""
+Chunked CSV and Parquet export of per-patient results.
+
+The table is built and written `chunk_rows` patients at a time, so
+writing a multi-million-patient run to a file (the CLI) never
+materializes the whole DataFrame or the whole CSV string in memory.
+`export_bytes` still returns the finished file as one bytes object,
+because a Streamlit download button needs the complete content.
+"""
+
+import io
+
+from simulator.engine import results_frame, slice_result
+
+EXPORT_CHUNK_ROWS = 100_000
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def iter_frames(result, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Results table in consecutive DataFrame chunks"""
+    n = len(result["arrival"])
+    for start in range(0, max(n, 1), chunk_rows):
+        yield results_frame(slice_result(result, start, start + chunk_rows), first=start + 1)
+
+
+def write_csv(result, target, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write the results table as UTF-8 CSV to a path or binary file object"""
+    f = open(target, "wb") if isinstance(target, str) else target
+    try:
+        for i, frame in enumerate(iter_frames(result, chunk_rows)):
+            f.write(frame.to_csv(index=False, header=i == 0).encode("utf-8"))
+    finally:
+        if f is not target:
+            f.close()
+
+
+def write_parquet(result, target, chunk_rows=EXPORT_CHUNK_ROWS, compression="zstd"):
+    """Write the results table as compressed Parquet, one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for frame in iter_frames(result, chunk_rows):
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema, compression=compression)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export_bytes(result, fmt="CSV", chunk_rows=EXPORT_CHUNK_ROWS):
+    """Whole export in memory, for download buttons (only the table chunks are bounded)"""
+    buffer = io.BytesIO()
+    if fmt == "CSV":
+        write_csv(result, buffer, chunk_rows)
+    elif fmt == "Parquet":
+        write_parquet(result, buffer, chunk_rows)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return buffer.getvalue()
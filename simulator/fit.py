@@ -0,0 +1,187 @@
+"""
+Goodness-of-fit tests for sampled arrival and service times.
+
+Expected bin probabilities come from a single vectorized CDF call over
+all bin edges, adjacent bins with too few expected observations are
+merged before the chi-square statistic is computed, and the same fitted
+distribution can be checked with Kolmogorov-Smirnov or Anderson-Darling.
+scipy is imported by the functions that use it, so pages can read the
+method lists at start-up without loading it.
+"""
+
+import numpy as np
+
+FIT_DISTRIBUTIONS = ["Exponential", "Poisson", "Uniform", "Normal", "Gamma2", "Erlang", "Binomial"]
+FIT_METHODS = ["Chi-Square", "Kolmogorov-Smirnov", "Anderson-Darling"]
+MIN_EXPECTED = 5
+INSUFFICIENT_DATA = "Insufficient data"
+# Estimated Erlang shapes are capped here; data whose coefficient of variation is
+# below MIN_CV (constant up to rounding) is treated as degenerate and gets shape 1
+MAX_ERLANG_SHAPE = 1000
+MIN_CV = 1e-6
+
+
+def fitted_distribution(dist, mean, data=None, estimate=False):
+    """
+    Frozen scipy distribution with the given mean.
+
+    Parameters other than the mean follow the simulator's generators
+    (Normal sd = 0.3 * mean, Uniform on [0.5, 1.5] * mean) unless
+    `estimate` is set, in which case they are estimated from `data`.
+    """
+    from scipy import stats
+
+    data = None if data is None else np.asarray(data, dtype=np.float64)
+    if dist == "Exponential":
+        return stats.expon(scale=mean)
+    elif dist == "Poisson":
+        return stats.poisson(mu=mean)
+    elif dist == "Uniform":
+        if estimate:
+            low, high = data.min(), data.max()
+            return stats.uniform(loc=low, scale=high - low)
+        return stats.uniform(loc=mean * 0.5, scale=mean)
+    elif dist == "Normal":
+        return stats.norm(loc=mean, scale=data.std() if estimate else mean * 0.3)
+    elif dist == "Gamma2":
+        return stats.gamma(2, scale=mean / 2)
+    elif dist == "Erlang":
+        # Shape from the method of moments (k = mean^2 / variance), in [1, MAX_ERLANG_SHAPE]
+        k = 2
+        if estimate:
+            degenerate = data.std() <= MIN_CV * abs(data.mean())
+            k = 1 if degenerate else int(min(MAX_ERLANG_SHAPE, max(1, round(mean ** 2 / data.var()))))
+        return stats.erlang(k, scale=mean / k)
+    elif dist == "Binomial":
+        # Method of moments: p = 1 - variance / mean, n = mean / p
+        p = 1 - data.var() / mean if estimate and mean > 0 else 0.5
+        p = p if 0 < p < 1 else 0.5
+        return stats.binom(max(1, round(mean / p)), p)
+    raise ValueError(f"Unknown distribution: {dist}")
+
+
+def merge_low_bins(observed, expected, bin_edges, min_expected=MIN_EXPECTED):
+    """Merge adjacent bins until every bin expects at least `min_expected` observations"""
+    keep = []
+    running = 0.0
+    for i, e in enumerate(expected):
+        running += e
+        if running >= min_expected:
+            keep.append(i)
+            running = 0.0
+    if not keep:
+        keep = [len(expected) - 1]
+    # Any short tail is folded into the last kept bin
+    keep[-1] = len(expected) - 1
+
+    starts = np.concatenate(([0], np.asarray(keep[:-1], dtype=np.int64) + 1))
+    merged_edges = np.concatenate((bin_edges[starts], [bin_edges[-1]]))
+    return np.add.reduceat(observed, starts), np.add.reduceat(expected, starts), merged_edges
+
+
+def _cdf_points(frozen, bin_edges):
+    """
+    Points at which to evaluate the CDF so its differences match histogram bins.
+
+    np.histogram bins are [low, high) with the last one closed. For discrete
+    distributions P(low <= X < high) is cdf(ceil(high) - 1) - cdf(ceil(low) - 1).
+    """
+    from scipy import stats
+
+    if not isinstance(frozen.dist, stats.rv_discrete):
+        return bin_edges
+    points = np.ceil(bin_edges) - 1
+    points[-1] = np.floor(bin_edges[-1])
+    return points
+
+
+def chi_square(data, dist, mean, bins="auto", estimate=False, ddof=0, alpha=0.05,
+               min_expected=MIN_EXPECTED):
+    """Chi-square goodness-of-fit test, returning the statistic, p-value and binned counts"""
+    from scipy import stats
+
+    data = np.asarray(data, dtype=np.float64)
+    observed, bin_edges = np.histogram(data, bins=bins)
+    frozen = fitted_distribution(dist, mean, data, estimate)
+
+    expected = np.diff(frozen.cdf(_cdf_points(frozen, bin_edges)))
+    total = expected.sum()
+    expected = expected * observed.sum() / total if total > 0 else np.full(len(observed), observed.mean())
+    observed, expected, bin_edges = merge_low_bins(observed, expected, bin_edges, min_expected)
+
+    dof = len(observed) - 1 - ddof
+    if dof < 1:
+        statistic, p_value = np.nan, np.nan
+    else:
+        statistic, p_value = stats.chisquare(observed, expected, ddof=ddof)
+    return {
+        "statistic": statistic,
+        "p_value": p_value,
+        "dof": dof,
+        "critical_value": stats.chi2.ppf(1 - alpha, dof) if dof >= 1 else np.nan,
+        "observed": observed,
+        "expected": expected,
+        "bin_edges": bin_edges,
+    }
+
+
+def _anderson_darling_pvalue(a2):
+    """Asymptotic p-value for a fully specified distribution (Marsaglia & Marsaglia, 2004)"""
+    z = a2
+    if z <= 0:
+        return 1.0
+    if z < 2:
+        cdf = np.exp(-1.2337141 / z) / np.sqrt(z) * (
+            2.00012 + (0.247105 - (0.0649821 - (0.0347962 - (0.011672 - 0.00168691 * z) * z) * z) * z) * z)
+    else:
+        cdf = np.exp(-np.exp(1.0776 - (2.30695 - (0.43424 - (0.082433 - (0.008056 - 0.0003146 * z) * z) * z) * z) * z))
+    return float(min(max(1 - cdf, 0.0), 1.0))
+
+
+def anderson_darling(data, frozen):
+    """Anderson-Darling statistic and p-value against a fully specified distribution"""
+    x = np.sort(np.asarray(data, dtype=np.float64))
+    n = len(x)
+    # Clip so that atoms at the support edges do not produce log(0)
+    cdf = np.clip(frozen.cdf(x), 1e-300, 1 - 1e-16)
+    i = np.arange(1, n + 1)
+    a2 = -n - np.sum((2 * i - 1) * (np.log(cdf) + np.log1p(-cdf[::-1]))) / n
+    return a2, _anderson_darling_pvalue(a2)
+
+
+def goodness_of_fit(data, dist, mean, method="Chi-Square", bins="auto", estimate=False, ddof=0,
+                    alpha=0.05):
+    """
+    Run one of FIT_METHODS and return a dict with statistic, p-value and verdict.
+
+    The verdict is INSUFFICIENT_DATA when no p-value can be computed: no
+    data, or a chi-square test left with a single bin after merging (short
+    C.P.-terminated runs often are).
+    """
+    from scipy import stats
+
+    if len(data) == 0:
+        return {"statistic": np.nan, "p_value": np.nan, "result": INSUFFICIENT_DATA}
+    if method == "Chi-Square":
+        result = chi_square(data, dist, mean, bins, estimate, ddof, alpha)
+    elif method == "Kolmogorov-Smirnov":
+        frozen = fitted_distribution(dist, mean, data, estimate)
+        statistic, p_value = stats.kstest(np.asarray(data, dtype=np.float64), frozen.cdf)
+        result = {"statistic": statistic, "p_value": p_value}
+    elif method == "Anderson-Darling":
+        frozen = fitted_distribution(dist, mean, data, estimate)
+        statistic, p_value = anderson_darling(data, frozen)
+        result = {"statistic": statistic, "p_value": p_value}
+    else:
+        raise ValueError(f"Unknown goodness-of-fit method: {method}")
+    if not np.isfinite(result["p_value"]):
+        result["result"] = INSUFFICIENT_DATA
+    else:
+        result["result"] = "Accepted" if result["p_value"] > alpha else "Rejected"
+    return result
+
+
+def chi_square_test(data, dist_name, mean):
+    """Chi-square test of `data` against the named distribution, as (statistic, p-value, verdict)"""
+    result = goodness_of_fit(data, dist_name, mean)
+    return round(result["statistic"], 2), round(result["p_value"], 4), result["result"]
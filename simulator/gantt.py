@@ -0,0 +1,206 @@
+"""
+Gantt chart rendering that stays responsive for large runs.
+
+Every chart is drawn with a single bar trace per layer instead of one
+trace per patient. When the visible time window holds few patients each
+one gets its own bar; otherwise service intervals are merged into
+per-server busy bands (with the gaps drawn as idle bands), at a
+resolution matched to the window width.
+
+plotly is imported when the first figure is built, so pages can import
+this module for its constants without paying for the plotting stack.
+
+The animated Gantt page uses `gantt_html` instead: the bars are embedded
+as base64 typed arrays in the graphical.html template (read once and kept
+in memory) and drawn by a single requestAnimationFrame canvas loop.
+"""
+
+import base64
+import functools
+import heapq
+import json
+import os
+
+import numpy as np
+
+MAX_PATIENT_BARS = 500
+BAND_RESOLUTION = 2000
+
+BUSY_COLOR = "#1f77b4"
+IDLE_COLOR = "#E5E8EF"
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "graphical.html")
+DATA_MARKER = "/*__GANTT_DATA__*/null"
+
+SERVER_COLORS = ["#F67280", "#C06C84", "#6C5B7B", "#355C7D", "#2A9D8F", "#E9C46A"]
+
+
+def visible_mask(bar_start, finish, window):
+    """Patients whose bar overlaps the [t0, t1] window"""
+    if window is None:
+        return np.ones(len(finish), dtype=bool)
+    t0, t1 = window
+    return (finish >= t0) & (bar_start <= t1)
+
+
+def busy_bands(start, completion, server, tolerance=0.0):
+    """
+    Merge service intervals into (server, band_start, band_end) arrays.
+
+    Consecutive intervals on the same server are joined when the idle gap
+    between them is at most `tolerance`.
+    """
+    if len(start) == 0:
+        empty = np.array([], dtype=np.float64)
+        return np.array([], dtype=np.int64), empty, empty
+
+    order = np.lexsort((start, server))
+    server, start, completion = server[order], start[order], completion[order]
+
+    new_band = np.ones(len(start), dtype=bool)
+    new_band[1:] = (server[1:] != server[:-1]) | (start[1:] - completion[:-1] > tolerance)
+    first = np.flatnonzero(new_band)
+    return server[first], start[first], np.maximum.reduceat(completion, first)
+
+
+def idle_bands(band_server, band_start, band_end, t0, t1, servers):
+    """Gaps between busy bands (and the window edges) for every server"""
+    idle_server, idle_start, idle_end = [], [], []
+    for k in range(servers):
+        mine = band_server == k
+        edges_start = np.concatenate(([t0], band_end[mine]))
+        edges_end = np.concatenate((band_start[mine], [t1]))
+        gap = edges_end > edges_start
+        idle_server.append(np.full(gap.sum(), k))
+        idle_start.append(edges_start[gap])
+        idle_end.append(edges_end[gap])
+    return np.concatenate(idle_server), np.concatenate(idle_start), np.concatenate(idle_end)
+
+
+def _patient_bars(index, bar_start, start, completion, server, label):
+    import plotly.graph_objects as go
+
+    names = [f"{label} {i}" for i in index]
+    colors = [SERVER_COLORS[k % len(SERVER_COLORS)] for k in server]
+    hover = [
+        f"{name}<br>Server {k + 1}<br>Start: {s:.2f}<br>Completion: {c:.2f}"
+        for name, k, s, c in zip(names, server, start, completion)
+    ]
+    fig = go.Figure(go.Bar(
+        base=bar_start, x=completion - bar_start, y=names, orientation="h",
+        marker_color=colors, hovertext=hover, hoverinfo="text", name=label,
+    ))
+    fig.update_yaxes(autorange="reversed", title=label)
+    fig.update_layout(height=min(max(300, 22 * len(names) + 100), 2000), showlegend=False)
+    return fig
+
+
+def _server_bands(start, completion, server, servers, t0, t1):
+    import plotly.graph_objects as go
+
+    tolerance = (t1 - t0) / BAND_RESOLUTION
+    band_server, band_start, band_end = busy_bands(start, completion, server, tolerance)
+    band_start, band_end = np.maximum(band_start, t0), np.minimum(band_end, t1)
+    idle_server, idle_start, idle_end = idle_bands(band_server, band_start, band_end, t0, t1, servers)
+
+    fig = go.Figure()
+    for name, color, k, s, e in [("Idle", IDLE_COLOR, idle_server, idle_start, idle_end),
+                                 ("Busy", BUSY_COLOR, band_server, band_start, band_end)]:
+        fig.add_trace(go.Bar(
+            base=s, x=e - s, y=[f"Server {i + 1}" for i in k], orientation="h",
+            marker_color=color, marker_line_width=0, name=name,
+            hovertemplate=name + ": %{base:.2f} to %{customdata:.2f}<extra></extra>",
+            customdata=e,
+        ))
+    fig.update_layout(barmode="overlay", height=max(250, 60 * servers + 150))
+    fig.update_yaxes(categoryorder="category descending")
+    return fig
+
+
+def gantt_figure(start, completion, server=None, window=None, max_bars=MAX_PATIENT_BARS,
+                 label="Patient", bar_start=None):
+    """
+    Build a Gantt chart for the patients visible in `window`.
+
+    Patient bars span `bar_start` (default: service start) to completion and
+    are used only when at most `max_bars` patients are visible; larger
+    windows switch to per-server busy/idle bands. Returns the figure and
+    the mode used ("patients" or "servers").
+    """
+    start = np.asarray(start, dtype=np.float64)
+    completion = np.asarray(completion, dtype=np.float64)
+    bar_start = start if bar_start is None else np.asarray(bar_start, dtype=np.float64)
+    server = np.zeros(len(start), dtype=np.int64) if server is None else np.asarray(server)
+    servers = int(server.max()) + 1 if len(server) else 1
+
+    if window is None:
+        window = (float(bar_start.min()) if len(bar_start) else 0.0,
+                  float(completion.max()) if len(completion) else 1.0)
+    mask = visible_mask(bar_start, completion, window)
+
+    if mask.sum() <= max_bars:
+        index = np.flatnonzero(mask) + 1
+        fig = _patient_bars(index, bar_start[mask], start[mask], completion[mask], server[mask], label)
+        mode = "patients"
+    else:
+        fig = _server_bands(start[mask], completion[mask], server[mask], servers, *window)
+        mode = "servers"
+
+    fig.update_xaxes(title="Time (minutes)", range=list(window))
+    return fig, mode
+
+
+def assign_lanes(start, completion):
+    """
+    Lane (server) for every interval so that intervals in a lane never overlap.
+
+    Used for recorded data without server ids: each interval, in start
+    order, takes the lane that became free earliest (the fewest lanes
+    any schedule needs).
+    """
+    start = np.asarray(start, dtype=np.float64)
+    completion = np.asarray(completion, dtype=np.float64)
+    lanes = np.empty(len(start), dtype=np.int64)
+    free = []  # (free_at, lane)
+    for i in np.argsort(start, kind="stable"):
+        if free and free[0][0] <= start[i]:
+            _, lane = heapq.heapreplace(free, (completion[i], free[0][1]))
+        else:
+            lane = len(free)
+            heapq.heappush(free, (completion[i], lane))
+        lanes[i] = lane
+    return lanes
+
+
+@functools.lru_cache(maxsize=2)
+def _template(mtime_ns):
+    with open(TEMPLATE, encoding="utf-8") as f:
+        return f.read()
+
+
+def _b64(values, dtype):
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode("ascii")
+
+
+def gantt_html(arrival, start, completion, server=None, label="Patient"):
+    """Animated canvas Gantt chart for the given patients as a standalone HTML page"""
+    arrival = np.asarray(arrival, dtype=np.float64)
+    start = np.asarray(start, dtype=np.float64)
+    completion = np.asarray(completion, dtype=np.float64)
+    server = assign_lanes(start, completion) if server is None else np.asarray(server, dtype=np.int64)
+    servers = int(server.max()) + 1 if len(server) else 1
+
+    order = np.lexsort((start, server))
+    payload = {
+        "prefix": label[0].upper(),
+        "laneOffsets": np.searchsorted(server[order], np.arange(servers + 1)).tolist(),
+        "id": _b64(order + 1, np.int32),
+        "arrival": _b64(arrival[order], np.float64),
+        "start": _b64(start[order], np.float64),
+        "completion": _b64(completion[order], np.float64),
+        "arrivalSorted": _b64(np.sort(arrival), np.float64),
+        "startSorted": _b64(np.sort(start), np.float64),
+        "completionSorted": _b64(np.sort(completion), np.float64),
+    }
+    # "</" cannot appear inside an inline <script>
+    data = json.dumps(payload).replace("</", "<\\/")
+    return _template(os.stat(TEMPLATE).st_mtime_ns).replace(DATA_MARKER, data)
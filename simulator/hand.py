@@ -0,0 +1,79 @@
+"""
+Streaming arrival generator for the hand-simulation page (app1.py.py).
+
+Customers are drawn in batches with a running clock, so arrival times
+are never re-summed from the start, and the cumulative-probability stop
+rule is evaluated over each batch with a cumsum and a searchsorted.
+"""
+
+import numpy as np
+
+MIN_TIME = 0.01
+
+
+def get_random(dist, mean, count=1, rng=None):
+    """Draw `count` values using the hand-simulation parameterisation"""
+    rng = np.random.default_rng() if rng is None else rng
+    if dist == "Exponential":
+        return rng.exponential(mean, count)
+    elif dist == "Poisson":
+        return rng.poisson(mean, count).astype(np.float64)
+    elif dist == "Uniform":
+        low = mean * 0.5
+        high = mean * 1.5
+        return rng.uniform(low, high, count)
+    elif dist == "Normal":
+        return rng.normal(mean, mean * 0.2, count)
+    else:
+        return np.zeros(count)
+
+
+def arrival_stream(arrival_dist, mean_arrival, service_dist, mean_service,
+                   batch_size=64, max_batch_size=65536, rng=None):
+    """
+    Yield (inter_arrival, arrival, service) blocks forever.
+
+    The clock carries over between blocks and the block size doubles up to
+    `max_batch_size`, so short runs stay cheap and long runs stay linear.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    clock = 0.0
+    while True:
+        inter_arrival = np.maximum(get_random(arrival_dist, mean_arrival, batch_size, rng), MIN_TIME)
+        service = np.maximum(get_random(service_dist, mean_service, batch_size, rng), MIN_TIME)
+        arrival = clock + np.cumsum(inter_arrival)
+        clock = arrival[-1]
+        yield inter_arrival, arrival, service
+        batch_size = min(batch_size * 2, max_batch_size)
+
+
+def hand_simulation(arrival_dist, mean_arrival, service_dist, mean_service,
+                    threshold=1.0, rng=None):
+    """
+    Generate customers until the cumulative probability reaches `threshold`.
+
+    Each customer adds 1 - exp(-inter_arrival / mean_arrival) to the running
+    total and the customer that brings it to `threshold` is the last one.
+    """
+    inter_blocks, arrival_blocks, service_blocks = [], [], []
+    cumulative_prob = 0.0
+
+    for inter_arrival, arrival, service in arrival_stream(
+            arrival_dist, mean_arrival, service_dist, mean_service, rng=rng):
+        cp = cumulative_prob + np.cumsum(-np.expm1(-inter_arrival / mean_arrival))
+        stop = int(np.searchsorted(cp, threshold, side="left"))
+        if stop < len(cp):
+            inter_blocks.append(inter_arrival[:stop + 1])
+            arrival_blocks.append(arrival[:stop + 1])
+            service_blocks.append(service[:stop + 1])
+            break
+        inter_blocks.append(inter_arrival)
+        arrival_blocks.append(arrival)
+        service_blocks.append(service)
+        cumulative_prob = cp[-1]
+
+    return {
+        "inter_arrival": np.concatenate(inter_blocks),
+        "arrival": np.concatenate(arrival_blocks),
+        "service": np.concatenate(service_blocks),
+    }
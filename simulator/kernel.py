@@ -0,0 +1,36 @@
+"""
+Array implementation of the single-server FIFO queue recursion.
+
+The per-patient loop
+
+    start[i] = max(arrival[i], completion[i-1])
+    completion[i] = start[i] + service[i]
+
+is the Lindley recursion. Writing S[i] for the cumulative service time,
+it unrolls to
+
+    completion[i] = S[i] + max_{j <= i} (arrival[j] - S[j-1])
+
+so the whole schedule is one cumsum and one cumulative maximum.
+"""
+
+import numpy as np
+
+
+def lindley(arrival, service):
+    """Return start/completion/waiting/turnaround float64 arrays for a FIFO single server"""
+    arrival = np.asarray(arrival, dtype=np.float64)
+    service = np.asarray(service, dtype=np.float64)
+
+    served_before = np.cumsum(service) - service
+    start = served_before + np.maximum.accumulate(arrival - served_before)
+    # Guard against round-off putting a start a hair before its arrival
+    np.maximum(start, arrival, out=start)
+    completion = start + service
+
+    return {
+        "start": start,
+        "completion": completion,
+        "waiting": start - arrival,
+        "turnaround": completion - arrival,
+    }
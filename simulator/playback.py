@@ -0,0 +1,74 @@
+"""
+Clock and snapshot helpers for the real-time queue playback.
+
+Playback no longer sleeps once per patient. A simulated clock advances
+by (elapsed wall time x speed-up) on every frame, and each frame shows
+the queue state at that instant, so any number of events can fall in
+one frame and the UI refresh rate is independent of the patient count.
+"""
+
+import time
+
+import numpy as np
+
+
+def new_playback_state():
+    """Stopped playback at simulated time zero"""
+    return {"clock": 0.0, "running": False, "wall": None}
+
+
+def play(state, now=None):
+    """Start or resume the clock"""
+    state["running"] = True
+    state["wall"] = time.monotonic() if now is None else now
+
+
+def pause(state, speedup, now=None):
+    """Freeze the clock where it is"""
+    advance(state, speedup, now=now)
+    state["running"] = False
+
+
+def stop(state):
+    """Stop and rewind to the beginning"""
+    state.update(new_playback_state())
+
+
+def advance(state, speedup, end=np.inf, now=None):
+    """Move the simulated clock forward by the wall time since the last frame"""
+    now = time.monotonic() if now is None else now
+    if state["running"] and state["wall"] is not None:
+        state["clock"] = min(state["clock"] + (now - state["wall"]) * speedup, end)
+        if state["clock"] >= end:
+            state["running"] = False
+    state["wall"] = now
+    return state["clock"]
+
+
+def build_timeline(arrival, start, completion):
+    """Pre-sort event times once so every frame is a few searchsorted calls"""
+    arrival = np.asarray(arrival, dtype=np.float64)
+    start = np.asarray(start, dtype=np.float64)
+    completion = np.asarray(completion, dtype=np.float64)
+    start_order = np.argsort(start, kind="stable")
+    return {
+        "arrival": np.sort(arrival),
+        "start": start[start_order],
+        "start_order": start_order,
+        "completion": np.sort(completion),
+        "end": float(completion.max()) if len(completion) else 0.0,
+    }
+
+
+def snapshot(timeline, clock):
+    """Queue counts at `clock` and the patient (0-based) who most recently started service"""
+    arrived = int(np.searchsorted(timeline["arrival"], clock, side="right"))
+    started = int(np.searchsorted(timeline["start"], clock, side="right"))
+    completed = int(np.searchsorted(timeline["completion"], clock, side="right"))
+    return {
+        "arrived": arrived,
+        "waiting": arrived - started,
+        "in_service": started - completed,
+        "completed": completed,
+        "latest": int(timeline["start_order"][started - 1]) if started else None,
+    }
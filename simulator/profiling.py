@@ -0,0 +1,194 @@
+"""
+Per-stage timing and memory counters for a page run or batch job.
+
+    profile = start_profile(memory=True, profiler="cProfile")
+    with stage("Sampling"):
+        ...
+    finish_profile(profile)
+    log_profile(profile, page="Simulator")
+
+`stage` is a no-op unless a profile is active in the current context, so
+library code such as `run_simulation` marks its phases unconditionally.
+Each stage records wall and CPU time, the change in resident memory and,
+when `memory` is on, the peak of the Python and NumPy allocations made
+inside it (tracemalloc, which slows allocation-heavy code noticeably).
+An optional cProfile or pyinstrument capture covers the whole run.
+"""
+
+import contextlib
+import contextvars
+import math
+import os
+import time
+
+PROFILERS = ["Off", "cProfile", "pyinstrument"]
+PROFILE_LINES = 40
+LOGGER_NAME = "simulator.performance"
+
+_ACTIVE = contextvars.ContextVar("simulator_profile", default=None)
+
+
+def available_profilers():
+    """PROFILERS that can be used here (pyinstrument is optional)"""
+    import importlib.util
+
+    return [name for name in PROFILERS if name != "pyinstrument" or importlib.util.find_spec("pyinstrument")]
+
+
+def _rss():
+    """Resident memory in bytes, or NaN where it cannot be read cheaply"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return math.nan
+
+
+def start_profile(memory=False, profiler="Off"):
+    """Begin collecting stages in the current context and start the optional profiler"""
+    import tracemalloc
+
+    profile = {
+        "stages": [], "stack": [], "memory": memory, "profiler": profiler, "report": None,
+        "owns_tracemalloc": memory and not tracemalloc.is_tracing(), "finished": False,
+        "started": time.perf_counter(), "cpu_started": time.process_time(), "rss_started": _rss(),
+    }
+    if profile["owns_tracemalloc"]:
+        tracemalloc.start()
+    if profiler == "cProfile":
+        import cProfile
+
+        profile["capture"] = cProfile.Profile()
+        profile["capture"].enable()
+    elif profiler == "pyinstrument":
+        from pyinstrument import Profiler
+
+        profile["capture"] = Profiler()
+        profile["capture"].start()
+    elif profiler != "Off":
+        raise ValueError(f"Unknown profiler: {profiler}")
+    _ACTIVE.set(profile)
+    return profile
+
+
+def finish_profile(profile):
+    """Stop the profiler and memory tracing and fill in the totals; safe to call twice"""
+    import tracemalloc
+
+    if profile["finished"]:
+        return profile
+    profile["finished"] = True
+    if _ACTIVE.get() is profile:
+        _ACTIVE.set(None)
+    capture = profile.pop("capture", None)
+    if profile["profiler"] == "cProfile":
+        import io
+        import pstats
+
+        capture.disable()
+        text = io.StringIO()
+        pstats.Stats(capture, stream=text).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        profile["report"] = text.getvalue()
+    elif profile["profiler"] == "pyinstrument":
+        capture.stop()
+        profile["report"] = capture.output_text(unicode=True, color=False)
+    if profile["owns_tracemalloc"]:
+        tracemalloc.stop()
+    profile["seconds"] = time.perf_counter() - profile["started"]
+    profile["cpu"] = time.process_time() - profile["cpu_started"]
+    profile["rss"] = _rss()
+    return profile
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Time the enclosed block as `name` (nested under any enclosing stage) in the active profile"""
+    profile = _ACTIVE.get()
+    if profile is None:
+        yield
+        return
+    import tracemalloc
+
+    stack = profile["stack"]
+    record = {"stage": " / ".join([frame["record"]["stage"] for frame in stack[-1:]] + [name]),
+              "depth": len(stack)}
+    profile["stages"].append(record)
+    frame = {"record": record, "child_peak": 0}
+    if profile["memory"]:
+        # The enclosing stage's peak so far is kept before resetting for this one
+        frame["base"], frame["outer_peak"] = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    stack.append(frame)
+    rss, cpu, started = _rss(), time.process_time(), time.perf_counter()
+    try:
+        yield
+    finally:
+        record["seconds"] = time.perf_counter() - started
+        record["cpu"] = time.process_time() - cpu
+        record["rss_delta"] = _rss() - rss
+        stack.pop()
+        if profile["memory"]:
+            peak = max(tracemalloc.get_traced_memory()[1], frame["child_peak"])
+            record["peak"] = peak - frame["base"]
+            if stack:
+                stack[-1]["child_peak"] = max(stack[-1]["child_peak"], peak, frame["outer_peak"])
+
+
+def profile_rows(profile):
+    """One row per stage, indented by nesting, for display"""
+    mb = 1 / 2**20
+    rows = []
+    for record in profile["stages"]:
+        if "seconds" not in record:
+            continue
+        row = {
+            "Stage": " " * record["depth"] + record["stage"].rsplit(" / ", 1)[-1],
+            "Time (ms)": record["seconds"] * 1e3,
+            "CPU (ms)": record["cpu"] * 1e3,
+            "RSS Δ (MB)": record["rss_delta"] * mb,
+        }
+        if profile["memory"]:
+            row["Peak Alloc. (MB)"] = record["peak"] * mb
+        rows.append(row)
+    return rows
+
+
+def _number(value):
+    return None if value is None or math.isnan(value) else round(float(value), 6)
+
+
+def log_profile(profile, **fields):
+    """Emit one JSON line with `fields`, the totals and every stage on the simulator.performance logger"""
+    import json
+    import logging
+
+    mb = 1 / 2**20
+    stages = {}
+    for record in profile["stages"]:
+        if "seconds" in record:
+            stages[record["stage"]] = {
+                "s": _number(record["seconds"]), "cpu_s": _number(record["cpu"]),
+                "rss_delta_mb": _number(record["rss_delta"] * mb),
+                **({"peak_mb": _number(record["peak"] * mb)} if profile["memory"] else {}),
+            }
+    # Caller fields come first so they cannot replace the marker or the totals
+    line = {
+        **fields, "event": "simulator.performance", "time": time.time(),
+        "total_s": _number(profile.get("seconds")), "cpu_s": _number(profile.get("cpu")),
+        "rss_mb": _number(profile.get("rss", math.nan) * mb), "stages": stages,
+    }
+    logging.getLogger(LOGGER_NAME).info(json.dumps(line, default=str, separators=(",", ":")))
+
+
+def configure_logging():
+    """Send performance lines to stderr, one JSON object per line, unless logging is already set up"""
+    import logging
+
+    logger = logging.getLogger(LOGGER_NAME)
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
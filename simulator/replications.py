@@ -0,0 +1,159 @@
+"""
+Monte-Carlo replication runner.
+
+Each replication gets its own `np.random.Generator` spawned from a single
+SeedSequence, so the streams are independent no matter how the work is
+split across processes, and the whole batch is reproducible from one seed.
+
+Runs ended by the cumulative-probability stop rule only last a few
+patients, so `run_cp_replications` simulates thousands of them at once:
+one row per replication in 2-D arrays, with the stopping index of every
+row found by counting along the rows.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from simulator.distributions import generate_times, get_cdf
+from simulator.engine import run_simulation, summarize
+from simulator.streams import make_rng, run_rng
+
+CP_BLOCK_WIDTH = 16
+CP_CHUNK_ROWS = 65536
+
+
+def _replicate(task):
+    """Run one replication in a worker process"""
+    params, seed_seq, bit_generator, crn = task
+    return summarize(run_simulation(**params, rng=run_rng(seed_seq, bit_generator, crn)))
+
+
+def run_replications(params, replications, seed=None, max_workers=None, bit_generator="PCG64", crn=False):
+    """
+    Run `replications` independent simulations and return one row of metrics per run.
+
+    `params` are the keyword arguments of `run_simulation`. With
+    `max_workers=1` everything runs in-process, which avoids pool start-up
+    for small batches. With `crn`, replication i of two calls with the same
+    seed runs on the same random numbers (see `simulator.streams`).
+    """
+    children = np.random.SeedSequence(seed).spawn(replications)
+    tasks = [(params, child, bit_generator, crn) for child in children]
+    return pd.DataFrame(map_tasks(_replicate, tasks, max_workers))
+
+
+def map_tasks(func, tasks, max_workers=None):
+    """`func` over `tasks` in a process pool, or in-process for one worker or one task"""
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(tasks) <= 1:
+        return [func(task) for task in tasks]
+    chunksize = max(1, len(tasks) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(func, tasks, chunksize=chunksize))
+
+
+def _cp_stop_sizes(params, rows, rng):
+    """
+    Arrival and service matrices for `rows` C.P. runs and the patient count of each.
+
+    Columns are drawn CP_BLOCK_WIDTH at a time and appended only while some
+    row has neither crossed both C.P. totals nor passed the horizon.
+    """
+    horizon = params["simulation_time"]
+    a = np.empty((rows, 0))
+    s = np.empty((rows, 0))
+    while True:
+        width = max(CP_BLOCK_WIDTH, a.shape[1])
+        a = np.hstack([a, generate_times(params["arrival_dist"], params["mean_arrival"], (rows, width), rng)])
+        s = np.hstack([s, generate_times(params["service_dist"], params["mean_service"], (rows, width), rng)])
+        arrival = np.cumsum(a, axis=1)
+        # All three running sums are non-decreasing, so each crossing index is a count
+        in_horizon = (arrival <= horizon).sum(axis=1)
+        cp_a = (np.cumsum(get_cdf(a, params["arrival_dist"], params["mean_arrival"]), axis=1) <= 1).sum(axis=1)
+        cp_s = (np.cumsum(get_cdf(s, params["service_dist"], params["mean_service"]), axis=1) <= 1).sum(axis=1)
+        n = np.minimum(in_horizon, np.maximum(cp_a, cp_s))
+        if np.all(n < a.shape[1]):
+            return arrival, s, n
+
+
+def _batch_queue(arrival, service, servers):
+    """FIFO start times of every row of `arrival`/`service` on `servers` servers"""
+    if servers == 1:
+        # Lindley recursion along each row, as in simulator.kernel.lindley
+        served_before = np.cumsum(service, axis=1) - service
+        return np.maximum(served_before + np.maximum.accumulate(arrival - served_before, axis=1), arrival)
+    rows = np.arange(len(arrival))
+    free = np.zeros((len(arrival), servers))
+    start = np.empty_like(arrival)
+    for j in range(arrival.shape[1]):
+        k = free.argmin(axis=1)
+        start[:, j] = np.maximum(arrival[:, j], free[rows, k])
+        free[rows, k] = start[:, j] + service[:, j]
+    return start
+
+
+def run_cp_replications(params, replications, seed=None, chunk_rows=CP_CHUNK_ROWS, bit_generator="PCG64"):
+    """
+    Many short C.P.-terminated FIFO runs as one array operation per chunk of rows.
+
+    Takes the same `params` as `run_replications` (with `enable_cp`) and
+    returns the same one-row-per-run metrics, so `confidence_intervals`
+    applies; the "Patients" column is the distribution of stopping sizes.
+    Patients past a row's stopping index are masked out of every metric.
+    """
+    if params.get("discipline", "FIFO") != "FIFO":
+        raise ValueError("Batched C.P. replications support the FIFO discipline only")
+    if not params.get("enable_cp"):
+        raise ValueError("Batched replications need the C.P. stop rule (enable_cp)")
+    rng = make_rng(seed, bit_generator)
+    servers = params.get("servers", 1)
+
+    frames = []
+    for first in range(0, replications, chunk_rows):
+        rows = min(chunk_rows, replications - first)
+        arrival, service, n = _cp_stop_sizes(params, rows, rng)
+        width = int(n.max(initial=0))
+        arrival, service = arrival[:, :width], service[:, :width]
+        start = _batch_queue(arrival, service, servers)
+        kept = np.arange(width) < n[:, None]
+
+        completion = start + service
+        first_arrival = arrival[:, 0] if width else np.zeros(rows)
+        span = np.where(kept, completion, -np.inf).max(axis=1, initial=-np.inf) - first_arrival
+        total_service = np.where(kept, service, 0).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frames.append(pd.DataFrame({
+                "Patients": n,
+                "Avg. Service Time": total_service / n,
+                "Avg. Waiting Time": np.where(kept, start - arrival, 0).sum(axis=1) / n,
+                "Avg. Turnaround Time": np.where(kept, completion - arrival, 0).sum(axis=1) / n,
+                # Mean of the per-server utilizations, 0 for a zero-length span as in simulate_servers
+                "Utilization": np.where(n == 0, np.nan,
+                                        np.where(span > 0, total_service / (servers * span), 0.0)),
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def confidence_intervals(runs, confidence=0.95):
+    """Student-t confidence interval for the mean of every metric column"""
+    from scipy import stats
+
+    rows = []
+    for column in runs.columns:
+        values = runs[column].dropna().to_numpy(dtype=np.float64)
+        k = len(values)
+        mean = values.mean() if k else np.nan
+        std = values.std(ddof=1) if k > 1 else np.nan
+        half_width = stats.t.ppf((1 + confidence) / 2, k - 1) * std / np.sqrt(k) if k > 1 else np.nan
+        rows.append({
+            "Metric": column,
+            "Mean": mean,
+            "Std. Dev.": std,
+            "Half-width": half_width,
+            "Lower": mean - half_width,
+            "Upper": mean + half_width,
+        })
+    return pd.DataFrame(rows)
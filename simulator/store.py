@@ -0,0 +1,31 @@
+"""
+Per-session results store.
+
+The Simulator page keeps the last run in `st.session_state` so that every
+downstream view (table, playback, histograms, chi-square, download) reads
+the same arrays on later reruns instead of re-simulating. The run is held
+in its `compact` form and expanded to full float64 arrays on load. The
+functions take any mutable mapping, so they work without Streamlit as well.
+"""
+
+from simulator.engine import compact, expand
+
+RESULTS_KEY = "sim_results"
+
+
+def save_results(state, params, result, metrics):
+    """Store one run, compacted, alongside its parameters and metrics"""
+    state[RESULTS_KEY] = {"params": dict(params), "arrays": compact(result), "metrics": dict(metrics)}
+
+
+def load_results(state):
+    """Return the stored run with full per-patient arrays, or None if nothing has been simulated yet"""
+    stored = state.get(RESULTS_KEY)
+    if stored is None:
+        return None
+    return {**stored, "arrays": expand(stored["arrays"])}
+
+
+def clear_results(state):
+    """Forget the stored run"""
+    state.pop(RESULTS_KEY, None)
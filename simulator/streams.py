@@ -0,0 +1,86 @@
+"""
+Seeded random-number streams for runs and comparisons.
+
+Every sampling function takes an explicit `rng`. It is either one
+`np.random.Generator` shared by all draws of a run, or, for common random
+numbers (CRN), the dict from `crn_streams` with a separate generator per
+purpose. With CRN, arrival and service times are drawn by inverse
+transform from their own stream's uniforms, so two configurations run
+from the same seed see the same arrivals and the same service quantiles
+even when the service distribution, the server count or the discipline
+differs. Antithetic streams replay the same uniforms mirrored as 1 - u.
+"""
+
+import numpy as np
+
+BIT_GENERATORS = ["PCG64", "Philox", "PCG64DXSM", "SFC64"]
+STREAMS = ("arrival", "service", "priority")
+
+
+def make_rng(seed=None, bit_generator="PCG64"):
+    """Generator on the named bit generator, seeded from an int or a SeedSequence"""
+    if bit_generator not in BIT_GENERATORS:
+        raise ValueError(f"Unknown bit generator: {bit_generator}")
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return np.random.Generator(getattr(np.random, bit_generator)(seed_seq))
+
+
+def crn_streams(seed=None, bit_generator="PCG64", antithetic=False):
+    """One independent generator per entry of STREAMS, all spawned from `seed`"""
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    # The children `spawn` would give a fresh copy, built without advancing `seed_seq`,
+    # so every call with the same SeedSequence returns the same streams
+    children = [np.random.SeedSequence(seed_seq.entropy, spawn_key=(*seed_seq.spawn_key, i),
+                                       pool_size=seed_seq.pool_size) for i in range(len(STREAMS))]
+    streams = {name: make_rng(child, bit_generator) for name, child in zip(STREAMS, children)}
+    streams["antithetic"] = antithetic
+    return streams
+
+
+def run_rng(seed=None, bit_generator="PCG64", crn=False, antithetic=False):
+    """The `rng` argument for one run: CRN streams (always, if antithetic) or a single generator"""
+    if crn or antithetic:
+        return crn_streams(seed, bit_generator, antithetic)
+    return make_rng(seed, bit_generator)
+
+
+def stream(rng, name):
+    """The generator to use for `name` draws; a single generator serves every purpose"""
+    if rng is None:
+        return np.random.default_rng()
+    return rng[name] if isinstance(rng, dict) else rng
+
+
+def inverse_times(dist, mean, u):
+    """Times with the `generate_times` distributions at probabilities `u` (inverse CDF)"""
+    from scipy import special
+
+    u = np.asarray(u, dtype=np.float64)
+    if dist == "Exponential":
+        return -mean * np.log1p(-u)
+    elif dist == "Poisson":
+        return np.maximum(np.ceil(special.pdtrik(u, mean)), 0.0)
+    elif dist == "Uniform":
+        return mean * (0.5 + u)
+    elif dist == "Normal":
+        return np.maximum(0, mean + mean * 0.3 * special.ndtri(u))
+    return np.full(u.shape, mean, dtype=np.float64)
+
+
+def draw_times(rng, name, dist, mean, size):
+    """
+    `size` times for the `name` stream.
+
+    A single generator samples directly with `generate_times`; CRN streams
+    go through `inverse_times` so that draw i uses the i-th uniform of the
+    stream whatever the distribution.
+    """
+    from simulator.distributions import generate_times
+
+    if isinstance(rng, dict):
+        u = rng[name].random(size)
+        if rng.get("antithetic"):
+            # 1 - u lies in (0, 1]; keep it below 1 so no time is infinite
+            u = np.minimum(1 - u, np.nextafter(1.0, 0.0))
+        return inverse_times(dist, mean, u)
+    return generate_times(dist, mean, size, stream(rng, name))
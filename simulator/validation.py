@@ -0,0 +1,150 @@
+"""
+Analytic-vs-simulation validation harness.
+
+Every configuration in a grid is simulated for a long horizon in several
+independent replications (all of them spread over one process pool), the
+warm-up period is discarded, and the steady-state waiting time and
+utilization are compared with the closed-form predictions used by the
+Queuing Calculator. Exact results (M/M/c and M/G/1) get a tight relative
+tolerance, approximations (M/G/c and G/G/c for c > 1) a looser one.
+
+    python -m simulator.validation --horizon 200000 --replications 8
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from simulator.analytic import model_metrics
+from simulator.distributions import squared_cv
+from simulator.engine import run_simulation
+from simulator.replications import map_tasks
+
+EXACT_TOLERANCE = 0.05
+APPROX_TOLERANCE = 0.25
+
+DEFAULT_GRID = [
+    {"arrival_dist": "Exponential", "mean_arrival": 1.0, "service_dist": "Exponential", "mean_service": 0.5, "servers": 1},
+    {"arrival_dist": "Exponential", "mean_arrival": 1.0, "service_dist": "Exponential", "mean_service": 0.8, "servers": 1},
+    {"arrival_dist": "Exponential", "mean_arrival": 1.0, "service_dist": "Exponential", "mean_service": 1.6, "servers": 2},
+    {"arrival_dist": "Exponential", "mean_arrival": 1.0, "service_dist": "Exponential", "mean_service": 4.5, "servers": 5},
+    {"arrival_dist": "Exponential", "mean_arrival": 1.0, "service_dist": "Uniform", "mean_service": 0.8, "servers": 1},
+    {"arrival_dist": "Exponential", "mean_arrival": 1.0, "service_dist": "Normal", "mean_service": 0.7, "servers": 1},
+    {"arrival_dist": "Exponential", "mean_arrival": 1.0, "service_dist": "Uniform", "mean_service": 1.6, "servers": 2},
+    {"arrival_dist": "Uniform", "mean_arrival": 1.0, "service_dist": "Exponential", "mean_service": 0.8, "servers": 1},
+    {"arrival_dist": "Normal", "mean_arrival": 1.0, "service_dist": "Exponential", "mean_service": 1.6, "servers": 2},
+]
+
+
+def queue_model(config):
+    """Kendall notation of a configuration and whether its formula is exact"""
+    arrival = "M" if config["arrival_dist"] == "Exponential" else "G"
+    service = "M" if config["service_dist"] == "Exponential" else "G"
+    name = f"{arrival}/{service}/{config['servers']}"
+    exact = arrival == "M" and (service == "M" or config["servers"] == 1)
+    return name, exact
+
+
+def analytic_prediction(config):
+    """Steady-state ρ, Lq and Wq predicted for one configuration"""
+    lambda_, mu = 1 / config["mean_arrival"], 1 / config["mean_service"]
+    sigma = np.sqrt(squared_cv(config["service_dist"], config["mean_service"])) * config["mean_service"]
+    ca = squared_cv(config["arrival_dist"], config["mean_arrival"])
+    if config["arrival_dist"] != "Exponential":
+        model = "G/G/c"
+    elif config["service_dist"] != "Exponential":
+        model = "M/G/c"
+    else:
+        model = "M/M/c"
+    metrics = model_metrics(model, lambda_, mu, config["servers"], sigma, ca)
+    return {key: float(metrics[key]) for key in ("rho", "lq", "wq")}
+
+
+def _validate(task):
+    """Steady-state averages of one long replication in a worker process"""
+    config, simulation_time, warmup, seed_seq = task
+    result = run_simulation(config["arrival_dist"], config["mean_arrival"], config["service_dist"],
+                            config["mean_service"], simulation_time, servers=config["servers"],
+                            rng=np.random.default_rng(seed_seq))
+    # Drop patients who arrived while the (initially empty) system was warming up
+    steady = result["arrival"] >= warmup * simulation_time
+    observed = simulation_time * (1 - warmup)
+    busy = result["service"][steady].sum()
+    return {
+        "wq": float(result["waiting"][steady].mean()),
+        "lq": float(result["waiting"][steady].sum() / observed),
+        "rho": float(busy / (observed * config["servers"])),
+    }
+
+
+def validate(grid=DEFAULT_GRID, simulation_time=100000, replications=8, warmup=0.1, seed=0,
+             confidence=0.95, max_workers=None):
+    """
+    Simulate every configuration of `grid` and compare it with the analytic model.
+
+    Returns one row per configuration and metric with the prediction, the
+    simulated mean and its confidence half-width, the relative error and
+    the verdict. A metric fails only when it is outside both the tolerance
+    band and the confidence interval.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(grid))
+    tasks = [(config, simulation_time, warmup, child)
+             for config, seed_seq in zip(grid, seeds) for child in seed_seq.spawn(replications)]
+    runs = map_tasks(_validate, tasks, max_workers)
+
+    t = stats.t.ppf((1 + confidence) / 2, replications - 1) if replications > 1 else np.nan
+    rows = []
+    for i, config in enumerate(grid):
+        name, exact = queue_model(config)
+        tolerance = EXACT_TOLERANCE if exact else APPROX_TOLERANCE
+        predicted = analytic_prediction(config)
+        block = runs[i * replications:(i + 1) * replications]
+        for metric, label in (("rho", "Utilization"), ("lq", "Lq"), ("wq", "Wq")):
+            values = np.array([run[metric] for run in block])
+            mean = values.mean()
+            half_width = t * values.std(ddof=1) / np.sqrt(replications) if replications > 1 else 0.0
+            analytic = predicted[metric]
+            error = abs(mean - analytic) / analytic if analytic else np.nan
+            inside = abs(mean - analytic) <= max(tolerance * abs(analytic), half_width)
+            rows.append({
+                "Model": name,
+                "Arrival": f"{config['arrival_dist']}({config['mean_arrival']:g})",
+                "Service": f"{config['service_dist']}({config['mean_service']:g})",
+                "Metric": label,
+                "Analytic": analytic,
+                "Simulated": mean,
+                "Half-width": half_width,
+                "Rel. Error": error,
+                "Tolerance": tolerance,
+                "Result": "Pass" if inside else "Fail",
+            })
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare simulated queues with the analytic formulas")
+    parser.add_argument("--horizon", type=float, default=100000, help="simulated minutes per replication")
+    parser.add_argument("--replications", type=int, default=8)
+    parser.add_argument("--warmup", type=float, default=0.1, help="fraction of the horizon to discard")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    report = validate(simulation_time=args.horizon, replications=args.replications, warmup=args.warmup,
+                      seed=args.seed, max_workers=args.workers)
+    elapsed = time.perf_counter() - started
+
+    with pd.option_context("display.width", 200, "display.max_rows", None):
+        print(report.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    failures = int((report["Result"] == "Fail").sum())
+    print(f"\n{len(report) - failures}/{len(report)} checks passed in {elapsed:.1f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Variance-reduction estimators for replication studies.
+
+Each estimator runs replications on `crn_streams` and returns the table of
+`confidence_intervals` with one more column, "Variance Reduction": the
+variance of plain independent replications of the same cost divided by
+the variance achieved, i.e. how many times fewer runs reach the same
+interval width.
+
+- `antithetic_replications`: every run is paired with a run on the
+  mirrored uniforms 1 - u, and a pair's average is one observation.
+- `compare_scenarios`: both scenarios run replication i on the same
+  random numbers, and the interval is for their difference.
+- `control_variate_replications`: statistics of each run whose expected
+  value is known exactly are regressed out of every metric. The controls
+  are the mean service time, the arrival count of a Poisson companion on
+  the run's arrival uniforms and, optionally, the waiting time of an
+  M/M/c companion against the Queuing Calculator's Wq. The last is a
+  steady-state value, so it is only unbiased for long runs with a warm-up.
+"""
+
+import numpy as np
+
+from simulator.distributions import sample_patients, time_mean
+from simulator.engine import run_simulation, slice_result, summarize
+from simulator.streams import crn_streams
+
+VARIANCE_METHODS = ["None", "Antithetic Variates", "Control Variates"]
+CONTROLS = ["Service Time", "Arrivals", "M/M/c Waiting Time"]
+DEFAULT_CONTROLS = ("Service Time", "Arrivals")
+
+
+def _with_reduction(table, plain_variance, variance):
+    """`table` with the plain-to-reduced variance ratio of every metric"""
+    plain_variance, variance = np.asarray(plain_variance), np.asarray(variance)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Rounding noise left over from a metric the method pins down exactly counts as zero
+        table["Variance Reduction"] = np.where(variance > 1e-12 * plain_variance, plain_variance / variance,
+                                               np.where(plain_variance > 0, np.inf, np.nan))
+    return table
+
+
+def _antithetic_pair(task):
+    """One run and its antithetic twin in a worker process"""
+    params, seed_seq, bit_generator = task
+    return [summarize(run_simulation(**params, rng=crn_streams(seed_seq, bit_generator, antithetic)))
+            for antithetic in (False, True)]
+
+
+def antithetic_replications(params, pairs, confidence=0.95, seed=None, max_workers=None, bit_generator="PCG64"):
+    """
+    Confidence intervals from `pairs` antithetic pairs (2 * pairs runs).
+
+    Takes the `params` of `run_replications`. The reduction compares the
+    pair averages with 2 * pairs independent runs; it is largest for
+    metrics that are monotone in the arrival and service times.
+    """
+    import pandas as pd
+
+    from simulator.replications import confidence_intervals, map_tasks
+
+    pairs_run = map_tasks(_antithetic_pair, [(params, child, bit_generator)
+                                             for child in np.random.SeedSequence(seed).spawn(pairs)], max_workers)
+    plain = pd.DataFrame([run for pair in pairs_run for run in pair])
+    means = (plain.iloc[0::2].reset_index(drop=True) + plain.iloc[1::2].reset_index(drop=True)) / 2
+    return _with_reduction(confidence_intervals(means, confidence),
+                           plain.var(ddof=1).to_numpy() / 2, means.var(ddof=1).to_numpy())
+
+
+def _scenario_pair(task):
+    """Replication i of both scenarios on the same streams, in a worker process"""
+    params, alternative, seed_seq, bit_generator = task
+    return [summarize(run_simulation(**scenario, rng=crn_streams(seed_seq, bit_generator)))
+            for scenario in (params, alternative)]
+
+
+def compare_scenarios(params, alternative, replications, confidence=0.95, seed=None, max_workers=None,
+                      bit_generator="PCG64"):
+    """
+    Confidence intervals for the difference alternative - params with common random numbers.
+
+    `alternative` holds the `run_simulation` arguments that change, for
+    example {"service_dist": "Normal"} or {"servers": 2}. The reduction is
+    against two independent sets of `replications` runs.
+    """
+    import pandas as pd
+
+    from simulator.replications import confidence_intervals, map_tasks
+
+    alternative = {**params, **alternative}
+    runs = map_tasks(_scenario_pair, [(params, alternative, child, bit_generator)
+                                      for child in np.random.SeedSequence(seed).spawn(replications)], max_workers)
+    base = pd.DataFrame([run for run, _ in runs])
+    other = pd.DataFrame([run for _, run in runs])
+    table = confidence_intervals(other - base, confidence).rename(columns={"Mean": "Difference"})
+    table.insert(1, "Current", base.mean().to_numpy())
+    table.insert(2, "Alternative", other.mean().to_numpy())
+    return _with_reduction(table, (base.var(ddof=1) + other.var(ddof=1)).to_numpy(),
+                           (other - base).var(ddof=1).to_numpy())
+
+
+def control_means(params, controls=DEFAULT_CONTROLS, warmup=0.0):
+    """Exact expected value of each control for runs with `params`"""
+    observed = params["simulation_time"] * (1 - warmup)
+    known = {
+        "Service Time": time_mean(params["service_dist"], params["mean_service"]),
+        "Arrivals": observed / params["mean_arrival"],
+    }
+    if "M/M/c Waiting Time" in controls:
+        from simulator.analytic import model_metrics
+
+        known["M/M/c Waiting Time"] = float(model_metrics("M/M/c", 1 / params["mean_arrival"],
+                                                          1 / params["mean_service"], params.get("servers", 1))["wq"])
+    return np.array([known[name] for name in controls])
+
+
+def _observe(result, start_time):
+    """`summarize` over the patients arriving from `start_time` on"""
+    first = int(np.searchsorted(result["arrival"], start_time))
+    return summarize(slice_result(result, first, len(result["arrival"])))
+
+
+def _controlled_run(task):
+    """Metrics of one run and its control statistics, in a worker process"""
+    params, seed_seq, bit_generator, controls, warmup = task
+    start_time = warmup * params["simulation_time"]
+    row = _observe(run_simulation(**params, rng=crn_streams(seed_seq, bit_generator)), start_time)
+    # Companion runs replay the run's arrival and service uniforms as exponential times
+    companion = (params["mean_arrival"], params["mean_service"], params["simulation_time"])
+    mmc = "M/M/c Waiting Time" in controls
+    if mmc:
+        twin = run_simulation("Exponential", companion[0], "Exponential", companion[1], companion[2],
+                              servers=params.get("servers", 1), rng=crn_streams(seed_seq, bit_generator))
+        twin_waiting = _observe(twin, start_time)["Avg. Waiting Time"]
+    else:
+        twin = sample_patients("Exponential", companion[0], "Exponential", companion[1], companion[2],
+                               rng=crn_streams(seed_seq, bit_generator))
+    values = {
+        "Service Time": row["Avg. Service Time"],
+        "Arrivals": len(twin["arrival"]) - int(np.searchsorted(twin["arrival"], start_time)),
+    }
+    if mmc:
+        values["M/M/c Waiting Time"] = twin_waiting
+    return row, [values[name] for name in controls]
+
+
+def control_variate_replications(params, replications, confidence=0.95, controls=DEFAULT_CONTROLS, warmup=0.0,
+                                 seed=None, max_workers=None, bit_generator="PCG64"):
+    """
+    Confidence intervals with `controls` regressed out of every metric.
+
+    Per metric the estimate is the intercept of a least-squares fit of the
+    run values on the controls minus their known means, and its variance
+    comes from the residuals with replications - 1 - k degrees of freedom.
+    Patients arriving before `warmup` times the horizon are left out. The
+    C.P. stop rule is not supported: it makes the run length depend on the
+    service times, so the controls' means are no longer known.
+    """
+    import pandas as pd
+    from scipy import stats
+
+    from simulator.replications import map_tasks
+
+    if params.get("enable_cp"):
+        raise ValueError("Control variates need horizon-terminated runs (enable_cp off)")
+    unknown = set(controls) - set(CONTROLS)
+    if unknown:
+        raise ValueError(f"Unknown controls: {sorted(unknown)}")
+    known = control_means(params, controls, warmup)
+    if not np.all(np.isfinite(known)):
+        raise ValueError("The M/M/c control needs a stable queue (ρ < 1)")
+
+    runs = map_tasks(_controlled_run, [(params, child, bit_generator, tuple(controls), warmup)
+                                       for child in np.random.SeedSequence(seed).spawn(replications)], max_workers)
+    plain = pd.DataFrame([row for row, _ in runs])
+    offsets = np.array([values for _, values in runs], dtype=np.float64).reshape(len(runs), len(controls)) - known
+
+    rows, plain_variance, variance = [], [], []
+    for column in plain.columns:
+        y = plain[column].to_numpy(dtype=np.float64)
+        usable = np.isfinite(y) & np.isfinite(offsets).all(axis=1)
+        x = offsets[usable]
+        # A control that never varies carries no information and would make the fit singular
+        x = x[:, x.std(axis=0) > 0] if len(x) else x
+        y = y[usable]
+        k, df = len(y), len(y) - 1 - x.shape[1]
+        design = np.column_stack([np.ones(k), x])
+        if df < 1:
+            coef, var = np.full(design.shape[1], np.nan), np.nan
+        else:
+            coef = np.linalg.lstsq(design, y, rcond=None)[0]
+            residual = y - design @ coef
+            var = residual @ residual / df * np.linalg.pinv(design.T @ design)[0, 0]
+        half_width = stats.t.ppf((1 + confidence) / 2, df) * np.sqrt(var) if df >= 1 else np.nan
+        rows.append({
+            "Metric": column,
+            "Mean": coef[0],
+            "Std. Dev.": np.sqrt(var * k),
+            "Half-width": half_width,
+            "Lower": coef[0] - half_width,
+            "Upper": coef[0] + half_width,
+        })
+        plain_variance.append(y.var(ddof=1) / k if k > 1 else np.nan)
+        variance.append(var)
+    return _with_reduction(pd.DataFrame(rows), plain_variance, variance)
+
+
+def required_replications(std, half_width, confidence=0.95):
+    """Fewest observations whose Student-t half-width at `std` is within `half_width`"""
+    from scipy import stats
+
+    std = np.atleast_1d(np.asarray(std, dtype=np.float64))
+    needed = np.full(std.shape, np.nan)
+    z = stats.norm.ppf((1 + confidence) / 2)
+    for i, s in enumerate(std):
+        if not np.isfinite(s) or half_width <= 0:
+            continue
+        # The normal-quantile count is a lower bound; t quantiles only add a few more
+        k = max(2, int(np.ceil((z * s / half_width) ** 2)))
+        while stats.t.ppf((1 + confidence) / 2, k - 1) * s / np.sqrt(k) > half_width:
+            k += 1
+        needed[i] = k
+    return needed
@@ -0,0 +1,67 @@
+from fractions import Fraction
+from math import factorial
+
+import numpy as np
+import pytest
+
+from simulator.analytic import calculate_p0_mmc, erlang_c, min_servers, model_metrics
+
+# (servers, λ, μ) with exact rational load λ/μ
+CASES = [(1, Fraction(1, 4), Fraction(1, 2)), (2, Fraction(3, 2), Fraction(1)), (5, Fraction(7, 2), Fraction(1)),
+         (10, Fraction(9), Fraction(1)), (40, Fraction(39, 10), Fraction(1, 10))]
+
+
+def exact_mmc(c, lambda_, mu):
+    """Erlang C and P₀ summed term by term in exact arithmetic"""
+    a = lambda_ / mu
+    tail = a ** c / factorial(c) * c / (c - a)
+    head = sum(a ** n / factorial(n) for n in range(c))
+    return tail / (head + tail), 1 / (head + tail)
+
+
+@pytest.mark.parametrize("c, lambda_, mu", CASES)
+def test_matches_exact_arithmetic(c, lambda_, mu):
+    wait, p0 = exact_mmc(c, lambda_, mu)
+    assert erlang_c(float(lambda_), float(mu), c) == pytest.approx(float(wait), rel=1e-10)
+    assert calculate_p0_mmc(float(lambda_), float(mu), c) == pytest.approx(float(p0), rel=1e-10)
+
+
+def test_broadcasts_and_flags_unstable_points():
+    c = np.array([case[0] for case in CASES] + [3])
+    lambda_ = np.array([float(case[1]) for case in CASES] + [3.0])
+    mu = np.array([float(case[2]) for case in CASES] + [1.0])
+    values = erlang_c(lambda_, mu, c)
+    np.testing.assert_allclose(values[:-1], [float(exact_mmc(*case)[0]) for case in CASES], rtol=1e-10)
+    assert np.isnan(values[-1])
+
+
+def test_large_server_counts_stay_finite():
+    value = erlang_c(1900.0, 1.0, 2000)
+    assert 0 < value < 1
+
+
+def test_min_servers_skips_the_critical_load():
+    # λ/μ = 2 exactly: two servers give ρ = 1, which is unstable
+    assert min_servers("M/M/c", 2.0, 1.0) == 3
+    assert min_servers("M/M/c", 0.5, 1.0) == 1
+
+
+def test_min_servers_at_the_utilization_bound():
+    assert min_servers("M/M/c", 2.0, 1.0, max_rho=0.5) == 4
+    assert min_servers("M/M/c", 2.0, 1.0, max_rho=0.4999) == 5
+
+
+def test_min_servers_at_the_waiting_bound():
+    wq = float(model_metrics("M/M/c", 2.0, 1.0, 4)["wq"])
+    assert min_servers("M/M/c", 2.0, 1.0, max_wq=wq) == 4
+    assert min_servers("M/M/c", 2.0, 1.0, max_wq=wq * (1 - 1e-9)) == 5
+
+
+def test_min_servers_at_the_server_cap():
+    assert min_servers("M/M/c", 99.0, 1.0, c_max=100) == 100
+    assert np.isnan(min_servers("M/M/c", 100.0, 1.0, c_max=100))
+
+
+def test_min_servers_over_a_grid():
+    lambda_ = np.array([0.5, 2.0, 7.5])
+    np.testing.assert_array_equal(min_servers("G/G/c", lambda_, 1.0, sigma=0.5, ca=1.0), [1, 3, 8])
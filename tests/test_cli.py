@@ -0,0 +1,123 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulator import cli
+from simulator.dataset import WORKBOOK
+
+
+def _strict(text):
+    """Parse `text` as JSON, failing on the non-standard NaN and Infinity literals"""
+    def reject(constant):
+        raise ValueError(f"non-standard JSON constant {constant}")
+
+    return json.loads(text, parse_constant=reject)
+
+
+def run_cli(capsys, *argv):
+    status = cli.main(list(argv))
+    return status, _strict(capsys.readouterr().out)
+
+
+def test_run_prints_a_summary(capsys):
+    status, summary = run_cli(capsys, "run", "--time", "480", "--seed", "1")
+    assert status == 0
+    assert summary["Patients"] > 0
+    assert 0 < summary["Utilization"] <= 1
+
+
+def test_empty_run_prints_null_not_nan(capsys):
+    status, summary = run_cli(capsys, "run", "--time", "0.001", "--seed", "1")
+    assert status == 0
+    assert summary["Patients"] == 0
+    assert summary["Avg. Waiting Time"] is None
+
+
+def test_run_is_reproducible_from_its_seed(capsys):
+    _, first = run_cli(capsys, "run", "--time", "480", "--seed", "3", "--crn", "--bit-generator", "Philox")
+    _, second = run_cli(capsys, "run", "--time", "480", "--seed", "3", "--crn", "--bit-generator", "Philox")
+    assert first == second
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".npz", ".parquet"])
+def test_run_writes_per_patient_output(capsys, tmp_path, suffix):
+    path = str(tmp_path / f"run{suffix}")
+    _, summary = run_cli(capsys, "run", "--time", "480", "--seed", "1", "--output", path)
+    if suffix == ".npz":
+        rows = len(np.load(path)["arrival"])
+    elif suffix == ".parquet":
+        rows = len(pd.read_parquet(path))
+    else:
+        rows = len(pd.read_csv(path))
+    assert rows == summary["Patients"]
+
+
+@pytest.mark.parametrize("extra", [[], ["--cp"], ["--variance-reduction", "antithetic"],
+                                   ["--variance-reduction", "control"]])
+def test_replicate_prints_intervals(capsys, tmp_path, extra):
+    path = str(tmp_path / "ci.csv")
+    status, table = run_cli(capsys, "replicate", "--replications", "20", "--seed", "1", "--workers", "1",
+                            "--output", path, *extra)
+    assert status == 0
+    assert table["Avg. Waiting Time"]["Lower"] <= table["Avg. Waiting Time"]["Upper"]
+    assert list(pd.read_csv(path)["Metric"]) == list(table)
+
+
+def test_compare_prints_strict_json_for_exact_differences(capsys):
+    status, table = run_cli(capsys, "compare", "--alt-service", "Normal", "--replications", "20", "--seed", "1",
+                            "--workers", "1")
+    assert status == 0
+    # Both scenarios share their arrivals, so the patient count difference is exactly zero
+    assert table["Patients"]["Difference"] == 0
+    assert table["Patients"]["Variance Reduction"] is None
+    assert table["Utilization"]["Variance Reduction"] > 1
+
+
+def test_analytic_matches_the_mm1_formula(capsys):
+    status, metrics = run_cli(capsys, "analytic", "--model", "M/M/c", "--lam", "0.25", "--mu", "0.5")
+    assert status == 0
+    assert metrics["rho"] == pytest.approx(0.5)
+    assert metrics["wq"] == pytest.approx(2.0)
+
+
+def test_analytic_unstable_queue_prints_null(capsys):
+    _, metrics = run_cli(capsys, "analytic", "--lam", "2", "--mu", "1")
+    assert metrics["wq"] is None
+
+
+def test_trace_from_csv(capsys, tmp_path):
+    path = tmp_path / "visits.csv"
+    pd.DataFrame({"arrived": [0.0, 2.0, 3.0, 7.0], "minutes": [3.0, 1.0, 2.0, 1.0]}).to_csv(path, index=False)
+    status, summary = run_cli(capsys, "trace", "--csv", str(path), "--arrival-column", "arrived",
+                              "--service-column", "minutes")
+    assert status == 0
+    assert summary["Patients"] == 4
+
+
+def test_trace_resampling_needs_a_horizon():
+    with pytest.raises(SystemExit):
+        cli.main(["trace", "--mode", "Bootstrap"])
+
+
+@pytest.mark.skipif(not os.path.exists(WORKBOOK), reason="lab workbook not present")
+def test_lab_data(capsys):
+    status, data = run_cli(capsys, "lab-data")
+    assert status == 0
+    assert data["service"]["count"] > 0
+
+
+def test_validate_passes_on_a_short_horizon(capsys):
+    status = cli.main(["validate", "--horizon", "20000", "--replications", "3", "--workers", "1"])
+    assert status == 0
+    assert "checks passed" in capsys.readouterr().out
+
+
+def test_trace_resampling_rejects_a_trace_without_gaps(tmp_path):
+    path = tmp_path / "visits.csv"
+    pd.DataFrame({"gap": [0.0, 0.0, 0.0], "minutes": [3.0, 1.0, 2.0]}).to_csv(path, index=False)
+    with pytest.raises(SystemExit, match="positive inter-arrival"):
+        cli.main(["trace", "--csv", str(path), "--inter-arrival-column", "gap", "--service-column", "minutes",
+                  "--mode", "Bootstrap", "--time", "60"])
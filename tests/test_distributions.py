@@ -0,0 +1,19 @@
+import numpy as np
+
+from simulator import distributions
+from simulator.distributions import _block_size, sample_patients
+from simulator.streams import make_rng
+
+
+def test_block_size_is_capped():
+    assert _block_size(1e9, 1e-3) == distributions.MAX_BLOCK
+    assert _block_size(60, 5.0) < distributions.MAX_BLOCK
+
+
+def test_runs_longer_than_one_block_are_contiguous(monkeypatch):
+    monkeypatch.setattr(distributions, "MAX_BLOCK", 64)
+    result = sample_patients("Exponential", 1.0, "Exponential", 0.9, 1000.0, rng=make_rng(0))
+    assert len(result["arrival"]) > 10 * 64
+    assert result["arrival"][-1] <= 1000.0
+    np.testing.assert_allclose(np.cumsum(result["inter_arrival"]), result["arrival"])
+    assert len(result["service"]) == len(result["arrival"])
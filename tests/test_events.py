@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from simulator.events import simulate_servers
+
+
+def naive_fifo(arrival, service, servers):
+    """Each patient in turn takes the server that frees up first (lowest index on ties)"""
+    free_at = [0.0] * servers
+    start, assigned = [], []
+    for a, s in zip(arrival, service):
+        k = min(range(servers), key=lambda k: (free_at[k], k))
+        start.append(max(a, free_at[k]))
+        free_at[k] = start[-1] + s
+        assigned.append(k)
+    return np.array(start), np.array(assigned)
+
+
+def naive_priority(arrival, service, servers, priority):
+    """Whenever a server frees up, it takes the lowest-priority-value patient already waiting"""
+    free_at = [0.0] * servers
+    pending = set(range(len(arrival)))
+    start = np.zeros(len(arrival))
+    while pending:
+        k = min(range(servers), key=lambda k: (free_at[k], k))
+        now = max(free_at[k], min(arrival[j] for j in pending))
+        j = min((j for j in pending if arrival[j] <= now), key=lambda j: (priority[j], j))
+        start[j] = now
+        free_at[k] = now + service[j]
+        pending.remove(j)
+    return start
+
+
+def workload(seed, n=300, integer=False):
+    rng = np.random.default_rng(seed)
+    if integer:
+        # Whole minutes make simultaneous arrivals and departures common
+        return np.cumsum(rng.integers(0, 4, n)).astype(float), rng.integers(0, 7, n).astype(float)
+    return np.cumsum(rng.exponential(2.0, n)), rng.exponential(3.5, n)
+
+
+@pytest.mark.parametrize("servers", [1, 2, 3])
+@pytest.mark.parametrize("integer", [False, True])
+def test_fifo_matches_the_per_patient_loop(servers, integer):
+    arrival, service = workload(servers, integer=integer)
+    start, assigned = naive_fifo(arrival, service, servers)
+    result = simulate_servers(arrival, service, servers)
+    np.testing.assert_allclose(result["start"], start, rtol=1e-12)
+    np.testing.assert_allclose(result["completion"], start + service, rtol=1e-12)
+    if servers > 1:
+        np.testing.assert_array_equal(result["server"], assigned)
+    busy = np.bincount(assigned, weights=service, minlength=servers)
+    np.testing.assert_allclose(result["utilization"], busy / ((start + service).max() - arrival[0]))
+
+
+@pytest.mark.parametrize("servers", [1, 2])
+@pytest.mark.parametrize("integer", [False, True])
+def test_priority_matches_the_per_patient_loop(servers, integer):
+    arrival, service = workload(10 + servers, integer=integer)
+    priority = np.random.default_rng(servers).integers(1, 4, len(arrival))
+    start = naive_priority(arrival, service, servers, priority)
+    result = simulate_servers(arrival, service, servers, "Priority", priority)
+    np.testing.assert_allclose(result["start"], start, rtol=1e-12)
+    assert np.all(result["waiting"] >= 0)
+
+
+def test_single_priority_level_is_fifo():
+    arrival, service = workload(5, integer=True)
+    fifo = simulate_servers(arrival, service, 2)
+    priority = simulate_servers(arrival, service, 2, "Priority", np.ones(len(arrival)))
+    np.testing.assert_array_equal(priority["start"], fifo["start"])
+
+
+def test_priority_needs_priorities():
+    with pytest.raises(ValueError):
+        simulate_servers([0.0], [1.0], 1, "Priority")
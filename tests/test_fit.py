@@ -0,0 +1,40 @@
+import numpy as np
+
+from simulator.fit import INSUFFICIENT_DATA, MAX_ERLANG_SHAPE, chi_square, fitted_distribution, goodness_of_fit
+
+
+def test_small_sample_is_insufficient_data():
+    data = np.array([2.1, 3.4, 5.0])
+    assert chi_square(data, "Exponential", 4.0)["dof"] < 1
+    result = goodness_of_fit(data, "Exponential", 4.0)
+    assert np.isnan(result["p_value"])
+    assert result["result"] == INSUFFICIENT_DATA
+
+
+def test_empty_sample_is_insufficient_data():
+    for method in ("Chi-Square", "Kolmogorov-Smirnov", "Anderson-Darling"):
+        assert goodness_of_fit(np.array([]), "Exponential", 4.0, method)["result"] == INSUFFICIENT_DATA
+
+
+def test_large_sample_gets_a_verdict():
+    data = np.random.default_rng(0).exponential(4.0, 5000)
+    assert goodness_of_fit(data, "Exponential", 4.0)["result"] == "Accepted"
+    assert goodness_of_fit(data, "Uniform", 4.0)["result"] == "Rejected"
+
+
+def test_erlang_shape_on_constant_and_near_constant_samples():
+    # np.full(11, 0.01) has a variance of about 3e-36 from rounding alone
+    for data in (np.full(50, 0.01), np.full(11, 0.01), np.full(7, 0.1)):
+        frozen = fitted_distribution("Erlang", data.mean(), data, estimate=True)
+        assert frozen.args[0] == 1
+        # The hand-simulation page's call, which used to raise TypeError inside scipy
+        chi_square(data, "Erlang", 0.1, bins=10, estimate=True, ddof=1)
+        assert goodness_of_fit(data, "Erlang", 0.1, estimate=True, ddof=1)["result"] in (
+            "Accepted", "Rejected", INSUFFICIENT_DATA)
+
+
+def test_erlang_shape_is_capped():
+    data = np.random.default_rng(0).normal(5.0, 1e-4, 1000)
+    frozen = fitted_distribution("Erlang", 5.0, data, estimate=True)
+    assert frozen.args[0] == MAX_ERLANG_SHAPE
+    assert np.isfinite(chi_square(data, "Erlang", 5.0, estimate=True, ddof=1)["statistic"])
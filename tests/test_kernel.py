@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from simulator.kernel import lindley
+
+
+def naive_lindley(arrival, service):
+    """The per-patient FIFO loop the kernel unrolls"""
+    start, completion = [], []
+    free_at = 0.0
+    for a, s in zip(arrival, service):
+        start.append(max(a, free_at))
+        free_at = start[-1] + s
+        completion.append(free_at)
+    return np.array(start), np.array(completion)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_the_per_patient_loop(seed):
+    rng = np.random.default_rng(seed)
+    arrival = np.cumsum(rng.exponential(4.0, 500))
+    service = rng.exponential(3.5, 500)
+    start, completion = naive_lindley(arrival, service)
+    result = lindley(arrival, service)
+    np.testing.assert_allclose(result["start"], start, rtol=1e-12)
+    np.testing.assert_allclose(result["completion"], completion, rtol=1e-12)
+    np.testing.assert_allclose(result["waiting"], start - arrival, rtol=1e-9, atol=1e-9)
+    assert np.all(result["waiting"] >= 0)
+
+
+def test_ties_idle_gaps_and_zero_service():
+    arrival = np.array([0.0, 0.0, 0.0, 10.0, 10.0, 30.0])
+    service = np.array([2.0, 0.0, 3.0, 1.0, 4.0, 0.0])
+    start, completion = naive_lindley(arrival, service)
+    result = lindley(arrival, service)
+    np.testing.assert_array_equal(result["start"], start)
+    np.testing.assert_array_equal(result["completion"], completion)
+    np.testing.assert_array_equal(result["turnaround"], completion - arrival)
+
+
+def test_empty_queue():
+    result = lindley([], [])
+    assert all(len(values) == 0 for values in result.values())
@@ -0,0 +1,18 @@
+import json
+import logging
+
+from simulator.profiling import LOGGER_NAME, finish_profile, log_profile, stage, start_profile
+
+
+def test_log_line_keeps_its_marker(caplog):
+    profile = start_profile()
+    with stage("Sampling"):
+        pass
+    finish_profile(profile)
+    with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+        log_profile(profile, page="Simulator", event="rerun", total_s=-1)
+    line = json.loads(caplog.records[-1].getMessage())
+    assert line["event"] == "simulator.performance"
+    assert line["page"] == "Simulator"
+    assert line["total_s"] >= 0
+    assert "Sampling" in line["stages"]
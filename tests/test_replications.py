@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from simulator.replications import run_cp_replications, run_replications
+
+CP_PARAMS = {"arrival_dist": "Exponential", "mean_arrival": 4.0, "service_dist": "Normal", "mean_service": 3.0,
+             "simulation_time": 60.0, "enable_cp": True}
+BATCHED_RUNS = 20000
+LOOPED_RUNS = 4000
+
+
+def _shares(runs):
+    return runs["Patients"].value_counts(normalize=True)
+
+
+# The multi-server case is loaded enough that some patients wait in the short C.P. runs
+@pytest.mark.parametrize("servers, mean_service", [(1, 3.0), (2, 10.0)])
+def test_batched_cp_replications_match_the_per_run_loop(servers, mean_service):
+    params = {**CP_PARAMS, "servers": servers, "mean_service": mean_service}
+    batched = run_cp_replications(params, BATCHED_RUNS, seed=1)
+    looped = run_replications(params, LOOPED_RUNS, seed=2, max_workers=1)
+
+    assert list(batched.columns) == list(looped.columns)
+    shares = _shares(batched).align(_shares(looped), fill_value=0.0)
+    assert np.abs(shares[0] - shares[1]).max() < 0.02
+
+    for column in looped.columns:
+        a, b = batched[column].dropna(), looped[column].dropna()
+        # Five standard errors of the difference between the two sample means
+        tolerance = 5 * np.sqrt(a.var() / len(a) + b.var() / len(b))
+        assert abs(a.mean() - b.mean()) <= tolerance, column
+
+
+def test_batched_cp_replications_reject_unsupported_runs():
+    with pytest.raises(ValueError):
+        run_cp_replications({**CP_PARAMS, "discipline": "Priority"}, 10)
+    with pytest.raises(ValueError):
+        run_cp_replications({**CP_PARAMS, "enable_cp": False}, 10)
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from simulator.trace import run_trace, trace_patients
+
+ZERO_GAPS = {"inter_arrival": np.zeros(5), "service": np.array([1.0, 2.0, 1.0, 3.0, 2.0])}
+
+
+@pytest.mark.parametrize("mode", ["Bootstrap", "Empirical CDF"])
+def test_resampling_rejects_a_trace_without_gaps(mode):
+    with pytest.raises(ValueError, match="positive inter-arrival"):
+        run_trace(ZERO_GAPS, mode, 60.0, rng=np.random.default_rng(0))
+
+
+def test_replay_accepts_a_trace_without_gaps():
+    result = run_trace(ZERO_GAPS, "Replay", rng=np.random.default_rng(0))
+    assert len(result["arrival"]) == 5
+    np.testing.assert_allclose(result["completion"].max(), ZERO_GAPS["service"].sum())
+
+
+@pytest.mark.parametrize("mode", ["Bootstrap", "Empirical CDF"])
+def test_resampling_covers_the_horizon(mode):
+    trace = {"inter_arrival": np.array([0.0, 0.0, 2.0]), "service": np.array([1.0, 2.0, 3.0])}
+    patients = trace_patients(trace, mode, 100.0, np.random.default_rng(1))
+    assert 0 < patients["arrival"][-1] <= 100.0
+    assert np.all(np.diff(patients["arrival"]) >= 0)